@@ -0,0 +1,12 @@
+#!/usr/bin/env python3
+
+# Thin wrapper kept for compatibility, see ../bin/rnaseq_tools/merge_genomes.py for the implementation.
+
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "bin"))
+from rnaseq_tools.merge_genomes import main  # noqa: E402
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,10 @@
+#!/usr/bin/env python
+
+# Pipeline entry point for the rnaseq_tools/preprocess_transcripts_fasta_gencode.py module, which holds the implementation.
+
+import sys
+
+from rnaseq_tools.preprocess_transcripts_fasta_gencode import main
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,22 @@
+# Released under the MIT license.
+
+"""Python tools bundled with the nf-core/rnaseq pipeline.
+
+Every tool is a module of this package exposing a main(argv) function. They are run either through the
+'rnaseq-tools' multi-command entry point (python -m rnaseq_tools <command>) or through the thin scripts kept
+in bin/ and alliance_canada/ for compatibility.
+
+Tools are run thousands of times per pipeline run, so interpreter startup matters. Only the requested tool is
+imported, and modules that are not needed on the common path (logging, statistics, numpy, ...) are imported
+lazily. The per-sample tools run by the pipeline, mqc_features_stat and fastq_dir_to_samplesheet, have a
+startup budget, check changes to them with:
+
+    python -X importtime -m rnaseq_tools mqc_features_stat --help
+
+The cumulative time of the rnaseq_tools.<command> line must stay below 5 ms; argparse (about 13 ms) is the only
+other module allowed on their common path. The reference preparation tools (filter_chromosome,
+replace_chromosome, merge_genomes, ...) run once per genome and import re, typing and the threaded I/O helpers
+eagerly, they only keep optional features (dry run, checkpoints) out of the common path.
+"""
+
+__version__ = "3.19.0"
@@ -0,0 +1,47 @@
+# Released under the MIT license.
+
+"""Multi-command entry point: rnaseq-tools <command> [arguments]."""
+
+import sys
+
+# Command name to module and description. Modules are only imported when their command is run.
+COMMANDS = {
+    "fastq_dir_to_samplesheet": "Generate nf-core/rnaseq samplesheet from a directory of FastQ files.",
+    "filter_chromosome": "Filters chromosomes and other annotations present in input file.",
+    "filter_gtf": "Filters a GTF file based on sequence names in a FASTA file.",
+    "gene_length_gc": "Compute gene lengths (union of exons) and GC content from a GTF and a genome FASTA file.",
+    "merge_genomes": "Merges main and spike-in genomes into a single reference.",
+    "mqc_features_stat": "Calculate features percentage for biotype counts.",
+    "preprocess_transcripts_fasta_gencode": "Clean GENCODE transcript FASTA headers and write a tx2gene file.",
+    "replace_chromosome": "Converts chromosomes in input file.",
+    "spikein_scale_factors": "Calculate spike-in fractions and scale factors from merged gene count matrices.",
+}
+
+
+def usage() -> str:
+    lines = ["usage: rnaseq-tools <command> [arguments]", "", "commands:"]
+    width = max(len(command) for command in COMMANDS)
+    lines.extend(f"  {command:<{width}}  {description}" for command, description in COMMANDS.items())
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] in ("-h", "--help"):
+        print(usage())
+        return 0 if argv else 2
+
+    command = argv[0].replace("-", "_")
+    if command not in COMMANDS:
+        print(f"{usage()}\n\nrnaseq-tools: error: unknown command '{argv[0]}'", file=sys.stderr)
+        return 2
+
+    from importlib import import_module
+
+    # Makes argparse report the full command in usage and error messages
+    sys.argv[0] = f"rnaseq-tools {argv[0]}"
+    return import_module(f"rnaseq_tools.{command}").main(argv[1:])
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,68 @@
+# Released under the MIT license.
+
+"""Minimal BGZF block reader and writer used to rewrite BAM headers.
+
+A BGZF file is a series of gzip members, each holding at most 64 KiB of data and storing its own compressed
+size in a 'BC' extra field, so blocks can be read, rewritten or copied one at a time without decompressing
+the rest of the file.
+"""
+
+import struct
+import zlib
+from typing import BinaryIO, Optional, Tuple
+
+# Same limit as htslib, leaves room for incompressible data to fit in a 64 KiB block
+MAX_BLOCK_DATA = 0xFF00
+MAX_BLOCK_SIZE = 0x10000
+HEADER = struct.Struct("<4BI2BH2BHH")
+FOOTER = struct.Struct("<II")
+EOF_BLOCK = bytes.fromhex("1f8b08040000000000ff0600424302001b0003000000000000000000")
+
+
+def read_block(file: BinaryIO) -> Optional[Tuple[bytes, bytes]]:
+    """
+    Reads the next BGZF block.
+
+    :param file: BGZF file opened in binary mode
+    :return: raw compressed block and its decompressed data, or None at end of file
+    """
+    header = file.read(HEADER.size)
+    if not header:
+        return None
+    if len(header) < HEADER.size:
+        raise ValueError("Truncated BGZF block")
+    id1, id2, method, flags, _, _, _, extra_length, si1, si2, subfield_length, block_size = HEADER.unpack(header)
+    if (id1, id2, method, flags) != (0x1F, 0x8B, 8, 4) or (si1, si2, subfield_length) != (66, 67, 2) \
+            or extra_length != 6:
+        raise ValueError("Not a BGZF file, BAM files must be compressed with bgzip or samtools")
+    body = file.read(block_size + 1 - HEADER.size)
+    if len(body) < block_size + 1 - HEADER.size:
+        raise ValueError("Truncated BGZF block")
+    data = zlib.decompress(body[:-FOOTER.size], wbits=-15)
+    crc, size = FOOTER.unpack(body[-FOOTER.size:])
+    if size != len(data) or crc != zlib.crc32(data):
+        raise ValueError("Corrupted BGZF block")
+    return header + body, data
+
+
+def compress_blocks(data: bytes, level: int = 6) -> bytes:
+    """
+    Compresses data in as many BGZF blocks as needed.
+
+    :param data: data to compress
+    :param level: zlib compression level
+    :return: compressed BGZF blocks
+    """
+    blocks = []
+    for start in range(0, len(data), MAX_BLOCK_DATA):
+        chunk = data[start:start + MAX_BLOCK_DATA]
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+        compressed = compressor.compress(chunk) + compressor.flush()
+        block_size = HEADER.size + len(compressed) + FOOTER.size
+        if block_size > MAX_BLOCK_SIZE:
+            return b"".join(blocks) + compress_blocks(chunk[:len(chunk) // 2], level) \
+                + compress_blocks(chunk[len(chunk) // 2:] + data[start + MAX_BLOCK_DATA:], level)
+        blocks.append(HEADER.pack(0x1F, 0x8B, 8, 4, 0, 0, 0xFF, 6, 66, 67, 2, block_size - 1))
+        blocks.append(compressed)
+        blocks.append(FOOTER.pack(zlib.crc32(chunk), len(chunk)))
+    return b"".join(blocks)
@@ -0,0 +1,210 @@
+# Released under the MIT license.
+
+"""Periodic checkpoints letting the streaming chromosome tools resume after being killed.
+
+A checkpoint records how many bytes of the input were processed, how many bytes of output were written for them
+and the state of the processing function (for example whether the current FASTA sequence is kept and which
+chromosomes were already reported as missing). It also records the options of the tool, including the size and
+modification time of its mapping files, so a run with other options does not resume from it. Checkpoints are only taken between two chunks of complete
+lines, after waiting for the writer thread, so input offset, output offset and state always match. Resuming
+truncates the output to the recorded offset, seeks the input and restores the state.
+
+Gzip compressed output is written as one gzip member per checkpoint interval, so the output can be truncated
+at any checkpoint and new members appended to it.
+"""
+
+import gzip
+import json
+import os
+import time
+from typing import BinaryIO, Iterator, Optional, Union
+
+from .threaded_io import ThreadedReader, ThreadedWriter
+from .utils import get_logger
+
+# Create a logger
+logger = get_logger("checkpoint")
+
+CHECKPOINT_INTERVAL = 60
+
+
+def file_fingerprint(path: str) -> dict[str, Union[str, int]]:
+    """Path, size and modification time of a file, to store in checkpoint options."""
+    if not os.path.isfile(path):
+        return {"path": path}
+    stat = os.stat(path)
+    return {"path": path, "size": stat.st_size, "mtime": stat.st_mtime_ns}
+
+
+class CheckpointReader(ThreadedReader):
+    """Iterates over the lines of a binary file, calling on_block with the input offset after each chunk of lines.
+
+    Line endings are translated like files opened in text mode.
+    """
+
+    def __init__(self, file: BinaryIO, offset: int, on_block):
+        super().__init__(file)
+        self.name = file.name
+        self.offset = offset
+        self._on_block = on_block
+
+    def __iter__(self) -> Iterator[str]:
+        parts = []
+        for chunk in self.chunks():
+            end = chunk.rfind(b"\n") + 1
+            if not end:
+                parts.append(chunk)
+                continue
+            parts.append(chunk[:end])
+            data = b"".join(parts)
+            parts = [chunk[end:]] if end < len(chunk) else []
+            yield from self._lines(data)
+            # Only reached once the caller asked for the line following the last line of data
+            self.offset += len(data)
+            self._on_block(self.offset)
+        if parts:
+            data = b"".join(parts)
+            yield from self._lines(data)
+            self.offset += len(data)
+
+    @staticmethod
+    def _lines(data: bytes) -> Iterator[str]:
+        text = data.decode()
+        if "\r" in text:
+            text = text.replace("\r\n", "\n").replace("\r", "\n")
+        lines = text.split("\n")
+        last = lines.pop()
+        for line in lines:
+            yield line + "\n"
+        if last:
+            yield last
+
+
+class CheckpointOutput:
+    """Text output file that can be truncated and continued at any checkpoint, gzip compressed if ending with .gz."""
+
+    def __init__(self, path: str, offset: int = 0):
+        self.name = path
+        self._raw = open(path, "r+b" if offset else "wb")
+        self._raw.truncate(offset)
+        self._raw.seek(offset)
+        self._gzip = None
+        self._compressed = path.endswith(".gz")
+        if self._compressed:
+            self._gzip = gzip.GzipFile(fileobj=self._raw, mode="wb")
+
+    def write(self, text: str) -> None:
+        (self._gzip or self._raw).write(text.encode())
+
+    def flush(self) -> None:
+        (self._gzip or self._raw).flush()
+
+    def checkpoint(self) -> int:
+        """Writes everything to disk and returns the output offset to truncate at when resuming."""
+        if self._compressed:
+            self._gzip.close()
+        self._raw.flush()
+        os.fsync(self._raw.fileno())
+        offset = self._raw.tell()
+        if self._compressed:
+            self._gzip = gzip.GzipFile(fileobj=self._raw, mode="wb")
+        return offset
+
+    def close(self) -> None:
+        if self._gzip is not None:
+            self._gzip.close()
+        self._raw.close()
+
+
+class Checkpoint:
+    """
+    Opens input and output files of a streaming tool, writing a checkpoint file next to the output periodically.
+
+    Use input, output and state of the checkpoint as input file, output file and state of the processing function.
+    If a checkpoint file is present, processing resumes from it. The checkpoint file is removed once the output is
+    complete.
+    """
+
+    def __init__(self, input_path: str, output_path: str, interval: float = CHECKPOINT_INTERVAL,
+                 options: Optional[dict] = None):
+        """
+        :param input_path: input file, gzip compressed if ending with .gz
+        :param output_path: output file, gzip compressed if ending with .gz
+        :param interval: minimum number of seconds between two checkpoints
+        :param options: JSON serializable options changing the output, resuming is refused if they differ
+        """
+        self.input_path = input_path
+        self.output_path = output_path
+        self.path = f"{output_path}.checkpoint"
+        self.interval = interval
+        self.options = options or {}
+        self.input: Optional[CheckpointReader] = None
+        self.output: Optional[ThreadedWriter] = None
+        self.state = {}
+        self._output_file: Optional[CheckpointOutput] = None
+        self._last_checkpoint = time.monotonic()
+
+    def __enter__(self) -> "Checkpoint":
+        input_offset = output_offset = 0
+        checkpoint = self._load()
+        if checkpoint is not None:
+            input_offset = checkpoint["input_offset"]
+            output_offset = checkpoint["output_offset"]
+            self.state = checkpoint["state"]
+            logger.info(f"Resuming from {self.path} at input offset {input_offset}, output offset {output_offset}")
+        input_file = gzip.open(self.input_path, "rb") if self.input_path.endswith(".gz") \
+            else open(self.input_path, "rb")
+        input_file.seek(input_offset)
+        self._output_file = CheckpointOutput(self.output_path, output_offset)
+        self.input = CheckpointReader(input_file, input_offset, self._on_block)
+        self.output = ThreadedWriter(self._output_file)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        try:
+            self.output.close()
+        finally:
+            self._output_file.close()
+            self.input.file.close()
+        if exc_type is None and os.path.exists(self.path):
+            os.remove(self.path)
+
+    def _load(self) -> Optional[dict]:
+        if not os.path.isfile(self.path):
+            return None
+        with open(self.path) as checkpoint_file:
+            checkpoint = json.load(checkpoint_file)
+        input_stat = os.stat(self.input_path)
+        if (checkpoint["input_size"], checkpoint["input_mtime"]) != (input_stat.st_size, input_stat.st_mtime_ns):
+            raise ValueError(f"Input file {self.input_path} changed since checkpoint, remove {self.path} to restart")
+        if checkpoint.get("options", {}) != self.options:
+            raise ValueError(f"Options changed since checkpoint, remove {self.path} to restart")
+        if not os.path.isfile(self.output_path) or os.path.getsize(self.output_path) < checkpoint["output_offset"]:
+            raise ValueError(f"Output file {self.output_path} is shorter than checkpoint, remove {self.path} to "
+                             f"restart")
+        return checkpoint
+
+    def _on_block(self, input_offset: int) -> None:
+        if time.monotonic() - self._last_checkpoint >= self.interval:
+            self.save(input_offset)
+
+    def save(self, input_offset: int) -> None:
+        """Writes all output to disk, then the checkpoint for the given input offset."""
+        self.output.sync()
+        output_offset = self._output_file.checkpoint()
+        input_stat = os.stat(self.input_path)
+        checkpoint = {
+            "input": self.input_path,
+            "input_size": input_stat.st_size,
+            "input_mtime": input_stat.st_mtime_ns,
+            "options": self.options,
+            "input_offset": input_offset,
+            "output_offset": output_offset,
+            "state": {key: sorted(value) if isinstance(value, set) else value for key, value in self.state.items()},
+        }
+        with open(f"{self.path}.tmp", "w") as checkpoint_file:
+            json.dump(checkpoint, checkpoint_file)
+            checkpoint_file.flush()
+            os.fsync(checkpoint_file.fileno())
+        os.replace(f"{self.path}.tmp", self.path)
+        self._last_checkpoint = time.monotonic()
@@ -0,0 +1,146 @@
+# Released under the MIT license.
+
+"""Index-only preview of the chromosomes kept, dropped and renamed by the chromosome tools.
+
+Sequence lengths come from the samtools index (.fai) when present, otherwise from a scan of the FASTA
+headers in a memory-mapped file, so the sequence itself is never decoded. GFF/GTF files are scanned in
+large binary blocks, only looking at the seqname column.
+"""
+
+import gzip
+import mmap
+import os
+import sys
+from collections import Counter
+from collections.abc import Callable
+
+from .threaded_io import ThreadedReader, open_text, threaded_reader
+from .utils import guess_format
+
+KEPT = "kept"
+DROPPED = "dropped"
+RENAMED = "renamed"
+
+
+def fasta_lengths(fasta: str) -> dict[str, int]:
+    """
+    Returns the length of all sequences present in FASTA file, in file order.
+
+    :param fasta: FASTA file
+    :return: dictionary of sequence name to sequence length
+    """
+    fai = f"{fasta}.fai"
+    if os.path.isfile(fai) and os.path.getmtime(fai) >= os.path.getmtime(fasta):
+        with open(fai) as index:
+            return {columns[0]: int(columns[1]) for columns in (line.split("\t", 2) for line in index if line.strip())}
+    if fasta.endswith(".gz") or os.path.getsize(fasta) == 0:
+        return _fasta_lengths_stream(fasta)
+    with open(fasta, "rb") as fasta_file, mmap.mmap(fasta_file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        return _fasta_lengths_mmap(data)
+
+
+def _fasta_lengths_mmap(data: mmap.mmap) -> dict[str, int]:
+    """Computes sequence lengths from header positions, assuming all lines of a sequence but the last have the same
+    length, like samtools faidx does."""
+    lengths = {}
+    header = 0 if data[:1] == b">" else data.find(b"\n>")
+    if header > 0:
+        header += 1
+    while header != -1:
+        header_end = data.find(b"\n", header)
+        if header_end == -1:
+            header_end = len(data)
+        name = (data[header + 1:header_end].split(None, 1) or [b""])[0].decode()
+        start = header_end + 1
+        next_header = data.find(b"\n>", header_end)
+        end = next_header + 1 if next_header != -1 else len(data)
+        size = max(end - start, 0)
+        if size:
+            first_line_end = data.find(b"\n", start, end)
+            if first_line_end == -1:
+                lengths[name] = size
+            else:
+                newline = 2 if data[first_line_end - 1:first_line_end] == b"\r" else 1
+                line_size = first_line_end + 1 - start
+                if data[end - 1:end] != b"\n":
+                    size += newline
+                lengths[name] = size - newline * -(-size // line_size)
+        else:
+            lengths[name] = 0
+        header = next_header + 1 if next_header != -1 else -1
+    return lengths
+
+
+def _fasta_lengths_stream(fasta: str) -> dict[str, int]:
+    lengths = {}
+    name = None
+    with open_text(fasta) as fasta_file:
+        for line in threaded_reader(fasta_file):
+            if line.startswith(">"):
+                name = (line[1:].split(None, 1) or [""])[0]
+                lengths[name] = 0
+            elif name is not None:
+                lengths[name] += len(line.rstrip("\r\n"))
+    return lengths
+
+
+def gff_feature_counts(gff: str) -> dict[str, int]:
+    """
+    Counts features of each seqname present in GFF/GTF file, in file order.
+
+    :param gff: GFF/GTF file
+    :return: dictionary of seqname to number of features
+    """
+    counts = Counter()
+    remainder = b""
+    with gzip.open(gff, "rb") if gff.endswith(".gz") else open(gff, "rb") as gff_file:
+        for chunk in ThreadedReader(gff_file).chunks():
+            lines = (remainder + chunk).split(b"\n")
+            remainder = lines.pop()
+            counts.update(line.partition(b"\t")[0] for line in lines if line and not line.startswith(b"#"))
+    if remainder and not remainder.startswith(b"#"):
+        counts[remainder.partition(b"\t")[0]] += 1
+    return {seqname.decode(): count for seqname, count in counts.items()}
+
+
+def report_chromosomes(input_path: str, report: str, convert_function: Callable[[str], str],
+                       input_format: str = None):
+    """
+    Writes which chromosomes would be kept, dropped or renamed without writing any output file.
+
+    :param input_path: FASTA or GFF/GTF file
+    :param report: report file, JSON if name ends with .json, tab delimited otherwise - '-' means standard output
+    :param convert_function: function returning the new name of a chromosome, or None if the chromosome is removed
+    :param input_format: input file format  (default: type is guessed using filename extension)
+    """
+    input_format = input_format or guess_format(input_path)
+    if input_format == "fasta":
+        unit = "bases"
+        sizes = fasta_lengths(input_path)
+    elif input_format == "gff":
+        unit = "features"
+        sizes = gff_feature_counts(input_path)
+    else:
+        print(f"File format {input_format} not implemented yet.", file=sys.stderr)
+        return
+
+    rows = []
+    for chromosome, size in sizes.items():
+        converted = convert_function(chromosome)
+        action = DROPPED if converted is None else KEPT if converted == chromosome else RENAMED
+        rows.append({"chromosome": chromosome, "converted": converted, "action": action, unit: size})
+    totals = {action: sum(row[unit] for row in rows if row["action"] == action) for action in (KEPT, DROPPED, RENAMED)}
+
+    with open_text(report, "w") as report_file:
+        if report.lower().endswith(".json"):
+            import json
+
+            json.dump({"input": input_path, "format": input_format, "unit": unit, "totals": totals,
+                       "chromosomes": rows}, report_file, indent=2)
+            report_file.write("\n")
+        else:
+            report_file.write(f"chromosome\tconverted\taction\t{unit}\n")
+            for row in rows:
+                report_file.write(f"{row['chromosome']}\t{row['converted'] or ''}\t{row['action']}\t{row[unit]}\n")
+            for action, total in totals.items():
+                report_file.write(f"#total\t\t{action}\t{total}\n")
@@ -0,0 +1,347 @@
+# Written by Harshil Patel and released under the MIT license.
+
+import os
+import sys
+
+from .utils import get_logger
+
+# Create a logger
+logger = get_logger("fastq_dir_to_samplesheet")
+
+MANIFEST_VERSION = 1
+
+# Directories modified less than this long before a scan are listed again on the next scan, as a file created
+# in the same clock tick as the scan would not change the directory mtime seen by the cache
+MTIME_SLACK_NS = 2_000_000_000
+
+
+def parse_args(args=None):
+    import argparse
+
+    Description = "Generate nf-core/rnaseq samplesheet from a directory of FastQ files."
+    Epilog = "Example usage: python fastq_dir_to_samplesheet.py <FASTQ_DIR> <SAMPLESHEET_FILE>"
+
+    parser = argparse.ArgumentParser(description=Description, epilog=Epilog)
+    parser.add_argument("FASTQ_DIR", help="Folder containing raw FastQ files.")
+    parser.add_argument("SAMPLESHEET_FILE", help="Output samplesheet file.")
+    parser.add_argument(
+        "-st",
+        "--strandedness",
+        type=str,
+        dest="STRANDEDNESS",
+        default="auto",
+        help="Value for 'strandedness' in samplesheet. Must be one of 'unstranded', 'forward', 'reverse', 'auto'.",
+    )
+    parser.add_argument(
+        "-r1",
+        "--read1_extension",
+        type=str,
+        dest="READ1_EXTENSION",
+        default="_R1_001.fastq.gz",
+        help="File extension for read 1.",
+    )
+    parser.add_argument(
+        "-r2",
+        "--read2_extension",
+        type=str,
+        dest="READ2_EXTENSION",
+        default="_R2_001.fastq.gz",
+        help="File extension for read 2.",
+    )
+    parser.add_argument(
+        "-se",
+        "--single_end",
+        dest="SINGLE_END",
+        action="store_true",
+        help="Single-end information will be auto-detected but this option forces paired-end FastQ files to be treated as single-end so only read 1 information is included in the samplesheet.",
+    )
+    parser.add_argument(
+        "-sn",
+        "--sanitise_name",
+        dest="SANITISE_NAME",
+        action="store_true",
+        help="Whether to further sanitise FastQ file name to get sample id. Used in conjunction with --sanitise_name_delimiter and --sanitise_name_index.",
+    )
+    parser.add_argument(
+        "-sd",
+        "--sanitise_name_delimiter",
+        type=str,
+        dest="SANITISE_NAME_DELIMITER",
+        default="_",
+        help="Delimiter to use to sanitise sample name.",
+    )
+    parser.add_argument(
+        "-si",
+        "--sanitise_name_index",
+        type=int,
+        dest="SANITISE_NAME_INDEX",
+        default=1,
+        help="After splitting FastQ file name by --sanitise_name_delimiter all elements before this index (1-based) will be joined to create final sample name.",
+    )
+    parser.add_argument(
+        "-re",
+        "--recursive",
+        dest="RECURSIVE",
+        action="store_true",
+        help="Whether or not to search for FastQ files recursively in <FASTQ_DIR>.",
+    )
+    parser.add_argument(
+        "-mf",
+        "--manifest",
+        type=str,
+        dest="MANIFEST",
+        default=None,
+        help="JSON file caching directory mtimes and FastQ file sizes between runs, so only directories that changed since the previous run are listed again.",
+    )
+    parser.add_argument(
+        "-w",
+        "--watch",
+        dest="WATCH",
+        action="store_true",
+        help="Poll <FASTQ_DIR> and only write the samplesheet once FastQ files are found and have stopped growing between two polls, or since the run that wrote <MANIFEST> at least one poll interval earlier.",
+    )
+    parser.add_argument(
+        "-wi",
+        "--watch_interval",
+        type=float,
+        dest="WATCH_INTERVAL",
+        default=60,
+        help="Seconds between two polls in --watch mode.",
+    )
+    return parser.parse_args(args)
+
+
+def load_manifest(manifest_file, fastq_dir, extensions, recursive):
+    """
+    Return the directory entries and FastQ file sizes cached by a previous scan, or empty caches if it was made with
+    other settings.
+    """
+    import json
+
+    if not manifest_file or not os.path.isfile(manifest_file):
+        return {}, {}
+    try:
+        with open(manifest_file) as fin:
+            manifest = json.load(fin)
+    except ValueError:
+        logger.warning(f"Ignoring unreadable manifest {manifest_file}")
+        return {}, {}
+    settings = {"version": MANIFEST_VERSION, "fastq_dir": fastq_dir, "extensions": extensions, "recursive": recursive}
+    if any(manifest.get(key) != value for key, value in settings.items()):
+        return {}, {}
+    return manifest.get("dirs", {}), manifest.get("sizes", {})
+
+
+def save_manifest(manifest_file, fastq_dir, extensions, recursive, dirs, sizes):
+    """Atomically write the directory entries and FastQ file sizes of a scan."""
+    import json
+
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "fastq_dir": fastq_dir,
+        "extensions": extensions,
+        "recursive": recursive,
+        "dirs": dirs,
+        "sizes": sizes,
+    }
+    with open(f"{manifest_file}.tmp", "w") as fout:
+        json.dump(manifest, fout)
+    os.replace(f"{manifest_file}.tmp", manifest_file)
+
+
+def scan_fastq_dir(fastq_dir, extensions, recursive=False, cached_dirs=None):
+    """
+    Find FastQ files matching any of the extensions, like glob does with '*<extension>' or '**/*<extension>'.
+
+    Every directory is stat-ed, but only directories whose mtime differs from the cached one are listed again:
+    adding, removing or renaming a file changes the mtime of its directory.
+
+    :param fastq_dir: folder containing FastQ files
+    :param extensions: FastQ file extensions
+    :param recursive: also search sub-directories, except hidden ones
+    :param cached_dirs: directory entries returned by a previous scan
+    :return: directory entries to cache, FastQ file paths and number of directories listed
+    """
+    import fnmatch
+    import time
+
+    cached_dirs = cached_dirs or {}
+    patterns = [f"*{extension}" for extension in extensions]
+    trusted_before = time.time_ns() - MTIME_SLACK_NS
+    dirs = {}
+    fastqs = []
+    listed = 0
+    stack = [fastq_dir]
+    while stack:
+        path = stack.pop()
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            continue
+        entry = cached_dirs.get(path)
+        if entry is None or entry["mtime"] != mtime:
+            listed += 1
+            files = []
+            subdirs = []
+            with os.scandir(path) as entries:
+                for dir_entry in entries:
+                    if dir_entry.name.startswith("."):
+                        continue
+                    if any(fnmatch.fnmatch(dir_entry.name, pattern) for pattern in patterns):
+                        files.append(dir_entry.name)
+                    if recursive and dir_entry.is_dir():
+                        subdirs.append(dir_entry.name)
+            entry = {"mtime": mtime if mtime < trusted_before else None, "files": files, "subdirs": subdirs}
+        dirs[path] = entry
+        fastqs.extend(os.path.join(path, name) for name in entry["files"])
+        stack.extend(os.path.join(path, name) for name in entry["subdirs"])
+    return dirs, fastqs, listed
+
+
+def fastq_sizes(fastqs):
+    """Return the size of each FastQ file, files removed since the scan are skipped."""
+    sizes = {}
+    for fastq in fastqs:
+        try:
+            sizes[fastq] = os.stat(fastq).st_size
+        except FileNotFoundError:
+            pass
+    return sizes
+
+
+def fastq_dir_to_samplesheet(
+    fastq_dir,
+    samplesheet_file,
+    strandedness="auto",
+    read1_extension="_R1_001.fastq.gz",
+    read2_extension="_R2_001.fastq.gz",
+    single_end=False,
+    sanitise_name=False,
+    sanitise_name_delimiter="_",
+    sanitise_name_index=1,
+    recursive=False,
+    manifest=None,
+    watch=False,
+    watch_interval=60,
+):
+    def sanitize_sample(path, extension):
+        """Retrieve sample id from filename"""
+        sample = os.path.basename(path).replace(extension, "")
+        if sanitise_name:
+            sample = sanitise_name_delimiter.join(
+                os.path.basename(path).split(sanitise_name_delimiter)[:sanitise_name_index]
+            )
+        return sample
+
+    def get_fastqs(extension):
+        """
+        Needs to be sorted to ensure R1 and R2 are in the same order
+        when merging technical replicates. Directory listings are not
+        guaranteed to produce sorted results.
+        """
+        import fnmatch
+
+        return sorted(fastq for fastq in fastqs if fnmatch.fnmatch(os.path.basename(fastq), f"*{extension}"))
+
+    def scan():
+        nonlocal cached_dirs
+        dirs, fastqs, listed = scan_fastq_dir(fastq_dir, extensions, recursive, cached_dirs)
+        sizes = fastq_sizes(fastqs) if watch or manifest else {}
+        if manifest:
+            save_manifest(manifest, fastq_dir, extensions, recursive, dirs, sizes)
+        cached_dirs = dirs
+        logger.info(f"Found {len(fastqs)} FastQ files, listed {listed} of {len(dirs)} directories")
+        return fastqs, sizes
+
+    extensions = [read1_extension] if single_end else [read1_extension, read2_extension]
+    cached_dirs, cached_sizes = load_manifest(manifest, fastq_dir, extensions, recursive)
+    # Files that kept their size since a run at least one poll ago have already stopped growing, read the manifest
+    # age before the scan rewrites it
+    stable_sizes = None
+    if watch:
+        import time
+
+        if cached_sizes and time.time() - os.path.getmtime(manifest) >= watch_interval:
+            stable_sizes = cached_sizes
+    fastqs, sizes = scan()
+    if watch:
+        previous_sizes = stable_sizes
+        while not fastqs or sizes != previous_sizes:
+            previous_sizes = sizes
+            time.sleep(watch_interval)
+            fastqs, sizes = scan()
+        logger.info("FastQ files have stopped growing")
+
+    read_dict = {}
+
+    ## Get read 1 files
+    for read1_file in get_fastqs(read1_extension):
+        sample = sanitize_sample(read1_file, read1_extension)
+        if sample not in read_dict:
+            read_dict[sample] = {"R1": [], "R2": []}
+        read_dict[sample]["R1"].append(read1_file)
+
+    ## Get read 2 files
+    if not single_end:
+        for read2_file in get_fastqs(read2_extension):
+            sample = sanitize_sample(read2_file, read2_extension)
+            read_dict[sample]["R2"].append(read2_file)
+
+    ## Write to file
+    if len(read_dict) > 0:
+        out_dir = os.path.dirname(samplesheet_file)
+        if out_dir and not os.path.exists(out_dir):
+            os.makedirs(out_dir)
+
+        header = ["sample", "fastq_1", "fastq_2", "strandedness"]
+        lines = [",".join(header) + "\n"]
+        for sample, reads in sorted(read_dict.items()):
+            for idx, read_1 in enumerate(reads["R1"]):
+                read_2 = ""
+                if idx < len(reads["R2"]):
+                    read_2 = reads["R2"][idx]
+                sample_info = ",".join([sample, read_1, read_2, strandedness])
+                lines.append(f"{sample_info}\n")
+        samplesheet = "".join(lines)
+
+        ## Only replace the samplesheet if it changed, so its mtime tells when new FastQ files were found
+        if os.path.isfile(samplesheet_file):
+            with open(samplesheet_file) as fin:
+                if fin.read() == samplesheet:
+                    logger.info(f"Samplesheet {samplesheet_file} is up to date")
+                    return
+        with open(f"{samplesheet_file}.tmp", "w") as fout:
+            fout.write(samplesheet)
+        os.replace(f"{samplesheet_file}.tmp", samplesheet_file)
+    else:
+        error_str = "\nWARNING: No FastQ files found so samplesheet has not been created!\n\n"
+        error_str += "Please check the values provided for the:\n"
+        error_str += "  - Path to the directory containing the FastQ files\n"
+        error_str += "  - '--read1_extension' parameter\n"
+        error_str += "  - '--read2_extension' parameter\n"
+        print(error_str)
+        sys.exit(1)
+
+
+def main(args=None):
+    args = parse_args(args)
+
+    strandedness = "auto"
+    if args.STRANDEDNESS in ["unstranded", "forward", "reverse", "auto"]:
+        strandedness = args.STRANDEDNESS
+
+    fastq_dir_to_samplesheet(
+        fastq_dir=args.FASTQ_DIR,
+        samplesheet_file=args.SAMPLESHEET_FILE,
+        strandedness=strandedness,
+        read1_extension=args.READ1_EXTENSION,
+        read2_extension=args.READ2_EXTENSION,
+        single_end=args.SINGLE_END,
+        sanitise_name=args.SANITISE_NAME,
+        sanitise_name_delimiter=args.SANITISE_NAME_DELIMITER,
+        sanitise_name_index=args.SANITISE_NAME_INDEX,
+        recursive=args.RECURSIVE,
+        manifest=args.MANIFEST,
+        watch=args.WATCH,
+        watch_interval=args.WATCH_INTERVAL,
+    )
@@ -0,0 +1,147 @@
+import re
+import sys
+from typing import TextIO
+from collections.abc import Callable
+
+from .threaded_io import open_text, threaded_reader, threaded_writer
+from .utils import guess_format
+
+
+def main(argv: list[str] = None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Filters chromosomes and other annotations present in input file.")
+    parser.add_argument('input', nargs='?', default='-',
+                        help="Input file with chromosomes to filter, gzip compressed if ending with .gz")
+    parser.add_argument('output', nargs='?', default='-',
+                        help="Output file with chromosomes filtered, gzip compressed if ending with .gz")
+    parser.add_argument('-f', '--format', choices = ['fasta', 'gff'], default=None,
+                        help="Input file format  (default: type is guessed using filename extension)")
+    parser.add_argument('-w', '--white', type=argparse.FileType('r'), required=True,
+                        help="Text file containing a white list of chromosome " +
+                             "(only the chromosomes present in white list will be kept).")
+    parser.add_argument('-n', '--dry-run', action="store_true", default=False,
+                        help="Only report bases (FASTA) or features (GFF) kept, dropped and renamed per chromosome "
+                             "without writing output - uses FASTA index (.fai) when present  (default: %(default)s)")
+    parser.add_argument('-r', '--report', default='-',
+                        help="Report file written by --dry-run, JSON if ending with .json, tab delimited otherwise  "
+                             "(default: standard output)")
+    parser.add_argument('--resume', action="store_true", default=False,
+                        help="Periodically write a checkpoint file next to output and resume from it if present, "
+                             "output is truncated to the last checkpoint  (default: %(default)s)")
+    parser.add_argument('--checkpoint-interval', type=float, default=60,
+                        help="Seconds between two checkpoints written by --resume  (default: %(default)s)")
+
+    args = parser.parse_args(argv)
+    if args.dry_run:
+        if args.input == '-':
+            parser.error("argument --dry-run: input must be a file")
+        from .dry_run import report_chromosomes
+
+        white_list = parse_chromosome_list(args.white)
+        report_chromosomes(input_path=args.input, report=args.report, input_format=args.format,
+                           convert_function=lambda chromosome: chromosome if chromosome in white_list else None)
+        return
+    if args.resume:
+        if args.input == '-' or args.output == '-':
+            parser.error("argument --resume: input and output must be files")
+        from .checkpoint import Checkpoint, file_fingerprint
+
+        options = {"format": args.format or guess_format(args.input), "white": file_fingerprint(args.white.name)}
+        with Checkpoint(args.input, args.output, interval=args.checkpoint_interval, options=options) as checkpoint:
+            filter_chromosome_white_list(input_file=checkpoint.input, output_file=checkpoint.output,
+                                         white_list_file=args.white, input_format=args.format,
+                                         state=checkpoint.state)
+        return
+    with open_text(args.input) as input_file, open_text(args.output, 'w') as output_file:
+        filter_chromosome_white_list(input_file=input_file, output_file=output_file, white_list_file=args.white,
+                                     input_format=args.format)
+
+
+def filter_chromosome_white_list(input_file: TextIO, output_file: TextIO, white_list_file: TextIO,
+    input_format: str = None, state: dict = None):
+    """
+    Filters chromosomes in input file using white list file.
+
+    :param input_file: input file with chromosomes to convert
+    :param output_file: output file with chromosomes replaced
+    :param white_list_file: text file containing a white list of chromosome
+    :param input_format: input file format  (default: type is guessed using filename extension)
+    :param state: processing state saved in checkpoints, restored when resuming
+    """
+    if not input_format:
+        try:
+            input_format = guess_format(input_file.name)
+        except AttributeError:
+            print(f"Input is not a file and no format parameter was given", file=sys.stderr)
+
+    while_list = parse_chromosome_list(white_list_file)
+    while_list_function = lambda chromosome: chromosome in while_list
+
+    if input_format == "fasta":
+        filter_chromosomes_fasta(input_file=input_file, output_file=output_file, filter_function=while_list_function,
+                                 state=state)
+    elif input_format == "gff":
+        filter_chromosomes_gff(input_file=input_file, output_file=output_file, filter_function=while_list_function)
+    else:
+        print(f"File format {input_format} not implemented yet.", file=sys.stderr)
+
+
+def filter_chromosomes_fasta(input_file: TextIO, output_file: TextIO, filter_function: Callable[[str], bool],
+                             state: dict = None):
+    """
+    Converts chromosomes in input FASTA file.
+
+    :param input_file: FASTA file with chromosomes to convert
+    :param output_file: output FASTA file with chromosomes replaced
+    :param filter_function: function that should return true if chromosome should be kept, false otherwise
+    :param state: processing state saved in checkpoints, restored when resuming
+    """
+    state = {} if state is None else state
+    chromosome_regex = re.compile(r"^>(\S*)(\s?)(.*)")
+    keep_chromosome = state.get("keep_chromosome", False)
+    with threaded_writer(output_file) as output:
+        for line in threaded_reader(input_file):
+            match = chromosome_regex.match(line)
+            if match:
+                chromosome = match.group(1)
+                keep_chromosome = state["keep_chromosome"] = filter_function(chromosome)
+                if keep_chromosome:
+                    output.write(line)
+            elif keep_chromosome:
+                output.write(line)
+
+
+def filter_chromosomes_gff(input_file: TextIO, output_file: TextIO, filter_function: Callable[[str], bool]):
+    """
+    Converts chromosomes in input GFF/GTF file.
+
+    :param input_file: GFF file with chromosomes to convert
+    :param output_file: output GFF file with chromosomes replaced
+    :param filter_function: function that should return true if chromosome should be kept, false otherwise
+    """
+    with threaded_writer(output_file) as output:
+        for line in threaded_reader(input_file):
+            if line.startswith("#"):
+                output.write(line)
+                continue
+            columns = line.rstrip("\r\n").split("\t")
+            chromosome = columns[0]
+            keep_chromosome = filter_function(chromosome)
+            if keep_chromosome:
+                output.write(line)
+
+
+def parse_chromosome_list(list_file: TextIO) -> set[str]:
+    """
+    Parses a list of chromosome names.
+
+    :param list_file: list containing chromosome names
+    :return: list containing chromosome names
+    """
+    chromosomes = set()
+    for line in list_file:
+        if line.startswith("#"):
+            continue
+        chromosomes.add(line.rstrip("\r\n"))
+    return chromosomes
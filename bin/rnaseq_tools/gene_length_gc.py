@@ -0,0 +1,185 @@
+# Released under the MIT license.
+
+import os
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from .threaded_io import open_text, threaded_reader
+from .utils import get_logger
+
+# Create a logger
+logger = get_logger("gene_length_gc")
+
+# Bases counted as G or C, IUPAC 'S' included
+GC_TABLE = np.zeros(256, dtype=np.uint8)
+GC_TABLE[np.frombuffer(b"GCSgcs", dtype=np.uint8)] = 1
+
+
+def read_gtf_exons(gtf: str) -> Tuple[List[str], List[str], Dict[str, Tuple[np.ndarray, np.ndarray, np.ndarray]]]:
+    """Read exons of a GTF file.
+
+    Returns the gene ids and gene names, in GTF order, and for each chromosome the 0-based half-open start and end
+    of its exons with the index of their gene.
+    """
+    gene_index = {}
+    gene_names = []
+    exons = {}
+    with open_text(gtf) as gtf_file:
+        for line in threaded_reader(gtf_file):
+            if line.startswith("#"):
+                continue
+            columns = line.split("\t", 8)
+            if len(columns) < 9 or columns[2] != "exon":
+                continue
+            attributes = columns[8]
+            start = attributes.find('gene_id "')
+            if start == -1:
+                continue
+            start += len('gene_id "')
+            gene_id = attributes[start : attributes.index('"', start)]
+            if gene_id not in gene_index:
+                gene_index[gene_id] = len(gene_index)
+                name_start = attributes.find('gene_name "')
+                if name_start == -1:
+                    gene_names.append(gene_id)
+                else:
+                    name_start += len('gene_name "')
+                    gene_names.append(attributes[name_start : attributes.index('"', name_start)])
+            exons.setdefault(columns[0], []).append((int(columns[3]) - 1, int(columns[4]), gene_index[gene_id]))
+
+    arrays = {}
+    for chromosome, chromosome_exons in exons.items():
+        array = np.array(chromosome_exons, dtype=np.int64).reshape(-1, 3)
+        arrays[chromosome] = (array[:, 0], array[:, 1], array[:, 2])
+    return list(gene_index), gene_names, arrays
+
+
+def merge_exons(starts: np.ndarray, ends: np.ndarray, genes: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Merge overlapping exons of each gene.
+
+    Exons are sorted by gene and start. Each gene is then shifted on its own segment of a virtual axis so that a
+    single cumulative maximum of exon ends, over all genes at once, tells which exons start a new merged interval.
+    """
+    order = np.lexsort((starts, genes))
+    starts, ends, genes = starts[order], ends[order], genes[order]
+    span = int(ends.max()) + 1
+    shift = genes * span
+    shifted_ends = np.maximum.accumulate(ends + shift)
+    new_interval = np.ones(len(starts), dtype=bool)
+    new_interval[1:] = starts[1:] + shift[1:] > shifted_ends[:-1]
+    first = np.flatnonzero(new_interval)
+    last = np.append(first[1:], len(starts)) - 1
+    return starts[first], shifted_ends[last] - shift[last], genes[first]
+
+
+def read_fai(fai: str) -> Dict[str, Tuple[int, int, int, int]]:
+    """Read length, offset, bases per line and bytes per line of each sequence of a samtools FASTA index."""
+    index = {}
+    with open(fai) as fai_file:
+        for line in fai_file:
+            columns = line.rstrip("\r\n").split("\t")
+            if len(columns) >= 5:
+                index[columns[0]] = (int(columns[1]), int(columns[2]), int(columns[3]), int(columns[4]))
+    return index
+
+
+def chromosome_gc(data: np.ndarray, length: int, offset: int, line_bases: int, line_width: int) -> np.ndarray:
+    """Return a 0/1 array of a chromosome sequence where 1 marks a G or C, read from a memory-mapped FASTA file.
+
+    The array has one extra trailing 0 so that interval ends can be used as reduceat indices.
+    """
+    full_lines, last_line = divmod(length, line_bases)
+    if full_lines and not last_line:
+        # The last line may not end with a newline
+        full_lines, last_line = full_lines - 1, line_bases
+    sequence = data[offset : offset + full_lines * line_width].reshape(-1, line_width)[:, :line_bases].ravel()
+    gc_mask = np.zeros(length + 1, dtype=np.uint8)
+    np.take(GC_TABLE, sequence, out=gc_mask[: len(sequence)])
+    if last_line:
+        start = offset + full_lines * line_width
+        np.take(GC_TABLE, data[start : start + last_line], out=gc_mask[len(sequence) : length])
+    return gc_mask
+
+
+def interval_sums(values: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """Sum values over each [start, end) interval at once using reduceat on interleaved starts and ends.
+
+    All ends must be lower than the length of values.
+    """
+    bounds = np.empty(2 * len(starts), dtype=np.int64)
+    bounds[0::2] = starts
+    bounds[1::2] = ends
+    sums = np.add.reduceat(values, bounds, dtype=np.int64)[0::2]
+    sums[starts >= ends] = 0
+    return sums
+
+
+def gene_length_gc(gtf: str, fasta: str, fai: str, output: str) -> None:
+    """Write the length (union of exons) and GC content of every gene of a GTF file.
+
+    Sequences are read one chromosome at a time from the memory-mapped FASTA file using its samtools index, so
+    memory usage is bounded by the largest chromosome.
+    """
+    gene_ids, gene_names, exons = read_gtf_exons(gtf)
+    logger.info(f"Read exons of {len(gene_ids)} genes on {len(exons)} sequences from {gtf}")
+    index = read_fai(fai) if fasta else {}
+
+    lengths = np.zeros(len(gene_ids), dtype=np.int64)
+    gc = np.zeros(len(gene_ids), dtype=np.int64)
+    chromosomes = [""] * len(gene_ids)
+    data = np.memmap(fasta, dtype=np.uint8, mode="r") if fasta else None
+    for chromosome, (starts, ends, genes) in exons.items():
+        starts, ends, genes = merge_exons(starts, ends, genes)
+        lengths += np.bincount(genes, weights=ends - starts, minlength=len(gene_ids)).astype(np.int64)
+        for gene in np.unique(genes):
+            chromosomes[gene] = chromosomes[gene] or chromosome
+        if data is None:
+            continue
+        if chromosome not in index:
+            logger.warning(f"Sequence {chromosome} not found in {fai}, GC content of its genes is not computed")
+            continue
+        length, offset, line_bases, line_width = index[chromosome]
+        gc_mask = chromosome_gc(data, length, offset, line_bases, line_width)
+        gene_gc = interval_sums(gc_mask, np.minimum(starts, length), np.minimum(ends, length))
+        gc += np.bincount(genes, weights=gene_gc, minlength=len(gene_ids)).astype(np.int64)
+        del gc_mask
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        gc_content = np.where(lengths > 0, gc / lengths, np.nan)
+
+    with open(output, "w") as out:
+        out.write("gene_id\tgene_name\tchromosome\tlength\tgc_count\tgc_content\n")
+        for row in zip(gene_ids, gene_names, chromosomes, lengths, gc, gc_content):
+            out.write("{}\t{}\t{}\t{}\t{}\t{:.4f}\n".format(*row))
+    logger.info(f"Wrote length and GC content of {len(gene_ids)} genes to {output}")
+
+
+def is_up_to_date(output: str, inputs: List[str]) -> bool:
+    """Return True if output exists and is newer than all inputs."""
+    if not os.path.isfile(output):
+        return False
+    output_time = os.path.getmtime(output)
+    return all(os.path.getmtime(input_file) <= output_time for input_file in inputs if input_file)
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Compute gene lengths (union of exons) and GC content from a GTF file and a genome FASTA file."
+    )
+    parser.add_argument("--gtf", required=True, help="GTF file, for example the output of filter_gtf.py")
+    parser.add_argument("--fasta", help="Genome FASTA file (uncompressed) - GC content is not computed if missing")
+    parser.add_argument("--fai", help="samtools index of the genome FASTA file (default: <FASTA>.fai)")
+    parser.add_argument("--output", default="gene_length_gc.tsv", help="Output gene table")
+    parser.add_argument("--force", action="store_true", help="Recompute table even if it is newer than the inputs")
+    args = parser.parse_args(argv)
+
+    fai = args.fai or (f"{args.fasta}.fai" if args.fasta else None)
+    if args.fasta and not os.path.isfile(fai):
+        parser.error(f"FASTA index {fai} not found, create it using 'samtools faidx {args.fasta}'")
+    if not args.force and is_up_to_date(args.output, [args.gtf, args.fasta, fai]):
+        logger.info(f"{args.output} is newer than inputs, use --force to recompute it")
+        return
+    gene_length_gc(args.gtf, args.fasta, fai, args.output)
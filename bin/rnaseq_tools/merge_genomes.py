@@ -0,0 +1,218 @@
+import functools
+import re
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import TextIO
+from collections.abc import Callable
+
+from . import filter_chromosome, replace_chromosome
+from .threaded_io import open_text, threaded_reader, threaded_writer
+
+
+def main(argv: list[str] = None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Merges main and spike-in genomes into a single reference, "
+                                                 "filtering and renaming chromosomes of each genome on the fly. "
+                                                 "Input files ending with .gz are decompressed.")
+    parser.add_argument('-g', '--genome', nargs=2, action='append', required=True, metavar=('NAME', 'FASTA'),
+                        help="Name and FASTA file of a genome to merge - can be repeated, "
+                             "genomes are written in the order they are given")
+    parser.add_argument('-a', '--annotation', nargs=2, action='append', default=[], metavar=('NAME', 'GTF'),
+                        help="GFF/GTF file associated with the genome NAME")
+    parser.add_argument('-w', '--white', nargs=2, action='append', default=[], metavar=('NAME', 'WHITE_LIST'),
+                        help="Text file containing a white list of chromosome for the genome NAME " +
+                             "(only the chromosomes present in white list will be kept).")
+    parser.add_argument('-m', '--mapping', nargs=2, action='append', default=[], metavar=('NAME', 'MAPPING'),
+                        help="Tab delimited text file containing source chromosomes and converted chromosomes " +
+                             "for the genome NAME")
+    parser.add_argument('-p', '--prefix', nargs=2, action='append', default=[], metavar=('NAME', 'PREFIX'),
+                        help="Prefix added to all chromosomes of the genome NAME, for example 'dm6_'")
+    parser.add_argument('-d', '--delete', action="store_true", default=False,
+                        help="Remove entries associated to a chromosomes without replacement in mapping file  "
+                             "(default: %(default)s)")
+    parser.add_argument('-s', '--source_column', type=int, default='1',
+                        help="Column index of source chromosomes in mapping files - 1 means first column of file" +
+                             "   (default: %(default)s)")
+    parser.add_argument('-c', '--converted_column', type=int, default='2',
+                        help="Column index of converted chromosomes in mapping files - 1 means first column of file" +
+                             "   (default: %(default)s)")
+    parser.add_argument('-o', '--output', default="merged",
+                        help="Prefix of output files - creates PREFIX.fa, PREFIX.gtf and PREFIX.manifest.txt  "
+                             "(default: %(default)s)")
+
+    args = parser.parse_args(argv)
+    names = [name for name, _ in args.genome]
+    for option, values in [("annotation", args.annotation), ("white", args.white), ("mapping", args.mapping),
+                           ("prefix", args.prefix)]:
+        for name, _ in values:
+            if name not in names:
+                parser.error(f"argument --{option}: genome {name} was not given using --genome")
+
+    annotations = dict(args.annotation)
+    white_lists = dict(args.white)
+    mappings = dict(args.mapping)
+    prefixes = dict(args.prefix)
+    genomes = []
+    for name, fasta in args.genome:
+        white_list = None
+        if name in white_lists:
+            with open(white_lists[name]) as white_list_file:
+                white_list = filter_chromosome.parse_chromosome_list(white_list_file)
+        mapping = None
+        if name in mappings:
+            with open(mappings[name]) as mapping_file:
+                mapping = replace_chromosome.parse_mapping(mapping_file=mapping_file,
+                                                           source_column=args.source_column - 1,
+                                                           converted_column=args.converted_column - 1)
+        rename_function = chromosome_rename_function(white_list=white_list, mappings=mapping,
+                                                     prefix=prefixes.get(name, ""), delete=args.delete)
+        genomes.append((name, fasta, annotations.get(name), rename_function))
+
+    merge_genomes(genomes=genomes, output_prefix=args.output)
+
+
+def merge_genomes(genomes: list[tuple[str, str, str, Callable[[str], str]]], output_prefix: str):
+    """
+    Merges genomes and their annotations, reading each input file only once.
+
+    FASTA and GFF/GTF files are merged concurrently.
+
+    :param genomes: name, FASTA file, GFF/GTF file (or None) and chromosome rename function of each genome
+    :param output_prefix: prefix of output files
+    """
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        fasta_future = executor.submit(merge_fasta, genomes=genomes, output=f"{output_prefix}.fa",
+                                       manifest=f"{output_prefix}.manifest.txt")
+        gff_future = None
+        if any(genome[2] for genome in genomes):
+            gff_future = executor.submit(merge_gff, genomes=genomes, output=f"{output_prefix}.gtf")
+        fasta_future.result()
+        if gff_future:
+            gff_future.result()
+
+
+def merge_fasta(genomes: list[tuple[str, str, str, Callable[[str], str]]], output: str, manifest: str):
+    """
+    Merges FASTA files of genomes and writes a manifest of chromosomes kept for each genome.
+
+    :param genomes: name, FASTA file, GFF/GTF file (or None) and chromosome rename function of each genome
+    :param output: output FASTA file
+    :param manifest: output manifest file containing genome, chromosome, source chromosome and length
+    """
+    with open_text(output, 'w') as output_file, open(manifest, 'w') as manifest_file:
+        manifest_file.write("genome\tchromosome\tsource_chromosome\tlength\n")
+        for name, fasta, _, rename_function in genomes:
+            with open_text(fasta) as input_file:
+                for chromosome, converted, length in rename_chromosomes_fasta(input_file=input_file,
+                                                                              output_file=output_file,
+                                                                              rename_function=rename_function):
+                    manifest_file.write(f"{name}\t{converted}\t{chromosome}\t{length}\n")
+
+
+def merge_gff(genomes: list[tuple[str, str, str, Callable[[str], str]]], output: str):
+    """
+    Merges GFF/GTF files of genomes, keeping header comments of the first GFF/GTF file only.
+
+    :param genomes: name, FASTA file, GFF/GTF file (or None) and chromosome rename function of each genome
+    :param output: output GFF/GTF file
+    """
+    first = True
+    with open_text(output, 'w') as output_file:
+        for _, _, gff, rename_function in genomes:
+            if not gff:
+                continue
+            with open_text(gff) as input_file:
+                rename_chromosomes_gff(input_file=input_file, output_file=output_file,
+                                       rename_function=rename_function, keep_header=first)
+            first = False
+
+
+def chromosome_rename_function(white_list: set[str] = None, mappings: dict[str, str] = None, prefix: str = "",
+                               delete: bool = False) -> Callable[[str], str]:
+    """
+    Creates a function returning the new name of a chromosome, or None if the chromosome must be removed.
+
+    :param white_list: chromosomes to keep - all chromosomes are kept if None
+    :param mappings: dictionary of input chromosomes to output chromosomes - chromosomes are not converted if None
+    :param prefix: prefix added to all chromosomes kept
+    :param delete: remove chromosomes without replacement in mappings
+    :return: function returning the new name of a chromosome, or None if the chromosome must be removed
+    """
+    # The function is called from both the FASTA and the GFF/GTF threads, the cache only saves lookups per GTF line
+    # and can call it twice for the same chromosome, so missing chromosomes are reported from a locked set
+    missing_chromosomes = set()
+    missing_lock = threading.Lock()
+
+    @functools.cache
+    def rename_function(chromosome: str) -> str:
+        if white_list is not None and chromosome not in white_list:
+            return None
+        if mappings is not None:
+            if chromosome in mappings:
+                chromosome = mappings[chromosome]
+            else:
+                with missing_lock:
+                    if chromosome not in missing_chromosomes:
+                        missing_chromosomes.add(chromosome)
+                        print(f"Chromosome {chromosome} not found in mapping file", file=sys.stderr)
+                if delete:
+                    return None
+        return f"{prefix}{chromosome}"
+    return rename_function
+
+
+def rename_chromosomes_fasta(input_file: TextIO, output_file: TextIO, rename_function: Callable[[str], str]):
+    """
+    Renames chromosomes in input FASTA file, removing chromosomes for which rename function returns None.
+
+    :param input_file: FASTA file with chromosomes to rename
+    :param output_file: output FASTA file with chromosomes renamed
+    :param rename_function: function returning the new name of a chromosome, or None if the chromosome must be removed
+    :return: generator of source chromosome, renamed chromosome and sequence length for each chromosome kept
+    """
+    chromosome_regex = re.compile(r"^>(\S*)(\s?)(.*)")
+    chromosome = None
+    converted = None
+    length = 0
+    with threaded_writer(output_file) as output:
+        for line in threaded_reader(input_file):
+            match = chromosome_regex.match(line.rstrip("\r\n"))
+            if match:
+                if converted:
+                    yield chromosome, converted, length
+                chromosome = match.group(1)
+                converted = rename_function(chromosome)
+                length = 0
+                if converted:
+                    output.write(f">{converted}{match.group(2)}{match.group(3)}\n")
+            elif converted:
+                output.write(line)
+                length += len(line.rstrip("\r\n"))
+    if converted:
+        yield chromosome, converted, length
+
+
+def rename_chromosomes_gff(input_file: TextIO, output_file: TextIO, rename_function: Callable[[str], str],
+                           keep_header: bool = True):
+    """
+    Renames chromosomes in input GFF/GTF file, removing chromosomes for which rename function returns None.
+
+    :param input_file: GFF file with chromosomes to rename
+    :param output_file: output GFF file with chromosomes renamed
+    :param rename_function: function returning the new name of a chromosome, or None if the chromosome must be removed
+    :param keep_header: write comment lines present before the first feature, like '#!genome-build'
+    """
+    in_header = True
+    with threaded_writer(output_file) as output:
+        for line in threaded_reader(input_file):
+            if line.startswith("#"):
+                if keep_header or not in_header:
+                    output.write(line)
+                continue
+            in_header = False
+            chromosome, separator, other_columns = line.partition("\t")
+            converted = rename_function(chromosome)
+            if converted:
+                output.write(f"{converted}{separator}{other_columns}")
@@ -0,0 +1,73 @@
+# Released under the MIT license.
+
+import gzip
+
+from .threaded_io import ThreadedReader
+from .utils import get_logger
+
+# Create a logger
+logger = get_logger("preprocess_transcripts_fasta_gencode")
+
+
+def preprocess_transcripts_fasta_gencode(fasta_in: str, fasta_out: str, tx2gene_out: str) -> None:
+    """Clean GENCODE transcript FASTA headers and write the transcript to gene mapping they contain.
+
+    GENCODE headers are pipe-delimited, e.g.
+    '>ENST00000456328.2|ENSG00000290825.1|-|-|DDX11L2-202|DDX11L2|1657|lncRNA|'. Only the transcript id is kept in
+    the output FASTA headers, the gene id and gene name are written to the tx2gene file. Headers are parsed as bytes
+    and the sequence between two headers is copied in bulk without being split into lines.
+    """
+    transcripts = 0
+    seen = set()
+    with gzip.open(fasta_in, "rb") if fasta_in.endswith(".gz") else open(fasta_in, "rb") as fasta, open(
+        fasta_out, "wb"
+    ) as out, open(tx2gene_out, "w") as tx2gene:
+        tx2gene.write("transcript_id\tgene_id\tgene_name\n")
+
+        def write_header(header: bytes) -> None:
+            nonlocal transcripts
+            fields = header[1:].rstrip(b"\r").split(b"|")
+            out.write(b">" + fields[0] + b"\n")
+            transcripts += 1
+            if len(fields) < 2 or fields[0] in seen:
+                return
+            seen.add(fields[0])
+            gene_name = fields[5] if len(fields) > 5 and fields[5] else fields[1]
+            tx2gene.write(f"{fields[0].decode()}\t{fields[1].decode()}\t{gene_name.decode()}\n")
+
+        remainder = b""
+        for chunk in ThreadedReader(fasta).chunks():
+            data = remainder + chunk if remainder else chunk
+            remainder = b""
+            position = 0
+            while True:
+                header = data.find(b">", position)
+                if header == -1:
+                    out.write(data[position:])
+                    break
+                out.write(data[position:header])
+                header_end = data.find(b"\n", header)
+                if header_end == -1:
+                    remainder = data[header:]
+                    break
+                write_header(data[header:header_end])
+                position = header_end + 1
+        if remainder:
+            write_header(remainder)
+
+    if len(seen) == 0:
+        logger.warning(f"No GENCODE gene ids found in headers of {fasta_in}")
+    logger.info(f"Processed {transcripts} transcripts, {len(seen)} written to {tx2gene_out}")
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Keep only transcript ids in GENCODE transcript FASTA headers and write a tx2gene file."
+    )
+    parser.add_argument("fasta", help="GENCODE transcript FASTA file, may be gzip compressed")
+    parser.add_argument("output", help="Output FASTA file with cleaned headers")
+    parser.add_argument("tx2gene", help="Output tab-delimited transcript to gene mapping file")
+    args = parser.parse_args(argv)
+    preprocess_transcripts_fasta_gencode(args.fasta, args.output, args.tx2gene)
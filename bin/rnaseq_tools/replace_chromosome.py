@@ -0,0 +1,328 @@
+import os
+import re
+import shutil
+import struct
+import sys
+from typing import BinaryIO, Optional, TextIO, Union
+
+from . import bgzf
+from .threaded_io import open_binary, open_text, threaded_reader, threaded_writer
+from .utils import guess_format
+
+
+def file_path(string):
+    if os.path.isfile(string):
+        return string
+    else:
+        raise FileNotFoundError(string)
+
+
+def main(argv: list[str] = None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Converts chromosomes in input file.")
+    parser.add_argument('input', nargs='?', default='-',
+                        help="Input file with chromosomes to convert, gzip compressed if ending with .gz")
+    parser.add_argument('output', nargs='?', default='-',
+                        help="Output file with chromosomes replaced, gzip compressed if ending with .gz")
+    parser.add_argument('-f', '--format', choices = ['fasta', 'gff', 'bed', 'bam'], default=None,
+                        help="Input file format, 'bed' also applies to bedGraph files  "
+                             "(default: type is guessed using filename extension)")
+    parser.add_argument('-d', '--delete', action="store_true", default=False,
+                        help="Remove entries associated to a chromosomes without replacement, not supported for BAM "
+                             "files  (default: %(default)s)")
+    parser.add_argument('-m', '--mapping', type=argparse.FileType('r'), default="chromAlias.txt",
+                        help="Tab delimited text file containing source chromosomes and converted chromosomes  "
+                             "(default: %(default)s)")
+    parser.add_argument('-s', '--source_column', type=int, default='1',
+                        help="Column index of source chromosomes in mapping file - 1 means first column of file" +
+                             "   (default: %(default)s)")
+    parser.add_argument('-c', '--converted_column', type=int, default='2',
+                        help="Column index of converted chromosomes in mapping file - 1 means first column of file" +
+                             "   (default: %(default)s)")
+    parser.add_argument('-n', '--dry-run', action="store_true", default=False,
+                        help="Only report bases (FASTA) or features (GFF) kept, dropped and renamed per chromosome "
+                             "without writing output - uses FASTA index (.fai) when present  (default: %(default)s)")
+    parser.add_argument('-r', '--report', default='-',
+                        help="Report file written by --dry-run, JSON if ending with .json, tab delimited otherwise  "
+                             "(default: standard output)")
+    parser.add_argument('--resume', action="store_true", default=False,
+                        help="Periodically write a checkpoint file next to output and resume from it if present, "
+                             "output is truncated to the last checkpoint - not supported for BAM files  "
+                             "(default: %(default)s)")
+    parser.add_argument('--checkpoint-interval', type=float, default=60,
+                        help="Seconds between two checkpoints written by --resume  (default: %(default)s)")
+
+    args = parser.parse_args(argv)
+    if args.dry_run:
+        if args.input == '-':
+            parser.error("argument --dry-run: input must be a file")
+        from .dry_run import report_chromosomes
+
+        mappings = parse_mapping(mapping_file=args.mapping, source_column=args.source_column - 1,
+                                 converted_column=args.converted_column - 1)
+        report_chromosomes(input_path=args.input, report=args.report, input_format=args.format,
+                           convert_function=lambda chromosome: mappings.get(chromosome,
+                                                                            None if args.delete else chromosome))
+        return
+    input_format = args.format or guess_format(args.input)
+    open_file = open_text
+    if input_format == "bam":
+        if args.delete:
+            parser.error("argument --delete: not supported for BAM files, only the header is rewritten")
+        if args.resume:
+            parser.error("argument --resume: not supported for BAM files, only the header is rewritten")
+        open_file = open_binary
+    if args.resume:
+        if args.input == '-' or args.output == '-':
+            parser.error("argument --resume: input and output must be files")
+        from .checkpoint import Checkpoint, file_fingerprint
+
+        options = {"format": input_format, "delete": args.delete, "mapping": file_fingerprint(args.mapping.name),
+                   "source_column": args.source_column, "converted_column": args.converted_column}
+        with Checkpoint(args.input, args.output, interval=args.checkpoint_interval, options=options) as checkpoint:
+            convert_chromosome(input_file=checkpoint.input, output_file=checkpoint.output, mapping_file=args.mapping,
+                               input_format=input_format, delete=args.delete,
+                               mapping_source_column=args.source_column - 1,
+                               mapping_converted_column=args.converted_column - 1, state=checkpoint.state)
+        return
+    with open_file(args.input) as input_file, open_file(args.output, 'w') as output_file:
+        convert_chromosome(input_file=input_file, output_file=output_file, mapping_file=args.mapping,
+                           input_format=input_format, delete=args.delete,
+                           mapping_source_column=args.source_column - 1,
+                           mapping_converted_column=args.converted_column - 1)
+
+
+def convert_chromosome(input_file: Union[TextIO, BinaryIO], output_file: Union[TextIO, BinaryIO],
+                       mapping_file: TextIO, input_format: str = None,
+                       delete: bool = False,
+                       mapping_source_column: int = 0, mapping_converted_column: int = 1, state: dict = None):
+    """
+    Converts chromosomes in input file.
+
+    :param input_file: input file with chromosomes to convert, opened in binary mode for BAM files
+    :param output_file: output file with chromosomes replaced, opened in binary mode for BAM files
+    :param input_format: input file format  (default: type is guessed using filename extension)
+    :param delete: remove entries associated to a chromosomes without replacement
+    :param mapping_file: tab delimited text file containing source chromosomes and converted chromosomes
+    :param mapping_source_column: column index of source chromosomes in mapping file
+    :param mapping_converted_column: column index of converted chromosomes in mapping file
+    :param state: processing state saved in checkpoints, restored when resuming
+    """
+    mappings = parse_mapping(mapping_file=mapping_file, source_column=mapping_source_column,
+                             converted_column=mapping_converted_column)
+
+    if not input_format:
+        try:
+            input_format = guess_format(input_file.name)
+        except AttributeError:
+            print(f"Input is not a file and no format parameter was given", file=sys.stderr)
+
+    if input_format == "fasta":
+        convert_chromosomes_fasta(input_file=input_file, output_file=output_file, mappings=mappings, delete=delete,
+                                  state=state)
+    elif input_format == "gff":
+        convert_chromosomes_gff(input_file=input_file, output_file=output_file, mappings=mappings, delete=delete,
+                                state=state)
+    elif input_format == "bed":
+        convert_chromosomes_bed(input_file=input_file, output_file=output_file, mappings=mappings, delete=delete,
+                                state=state)
+    elif input_format == "bam":
+        if delete:
+            raise ValueError("Removing chromosomes is not supported for BAM files")
+        convert_chromosomes_bam(input_file=input_file, output_file=output_file, mappings=mappings)
+    else:
+        print(f"File format {input_format} not implemented yet.", file=sys.stderr)
+
+
+def convert_chromosomes_fasta(input_file: TextIO, output_file: TextIO, mappings: dict[str, str], delete: bool = False,
+                              state: dict = None):
+    """
+    Converts chromosomes in input FASTA file.
+
+    :param input_file: FASTA file with chromosomes to convert
+    :param output_file: output FASTA file with chromosomes replaced
+    :param mappings: dictionary of input chromosomes to output chromosomes
+    :param delete: remove entries associated to a chromosomes without replacement
+    :param state: processing state saved in checkpoints, restored when resuming
+    """
+    state = {} if state is None else state
+    missing_chromosomes = state["missing_chromosomes"] = set(state.get("missing_chromosomes", ()))
+    chromosome_regex = re.compile(r"^>(\S*)(\s?)(.*)")
+    delete_sequence = state.get("delete_sequence", False)
+    with threaded_writer(output_file) as output:
+        for line in threaded_reader(input_file):
+            match = chromosome_regex.match(line.rstrip("\r\n"))
+            if match:
+                chromosome = match.group(1)
+                if chromosome in mappings:
+                    delete_sequence = state["delete_sequence"] = False
+                    output.write(f">{mappings[chromosome]}{match.group(2)}{match.group(3)}\n")
+                else:
+                    delete_sequence = state["delete_sequence"] = delete
+                    if chromosome not in missing_chromosomes:
+                        missing_chromosomes.add(chromosome)
+                        print(f"Chromosome {chromosome} not found in mapping file", file=sys.stderr)
+                    if not delete:
+                        output.write(line)
+            elif not delete_sequence:
+                output.write(line)
+
+
+def convert_chromosomes_gff(input_file: TextIO, output_file: TextIO, mappings: dict[str, str], delete: bool = False,
+                            state: dict = None):
+    """
+    Converts chromosomes in input GFF/GTF file.
+
+    :param input_file: GFF file with chromosomes to convert
+    :param output_file: output GFF file with chromosomes replaced
+    :param mappings: dictionary of input chromosomes to output chromosomes
+    :param delete: remove entries associated to a chromosomes without replacement
+    :param state: processing state saved in checkpoints, restored when resuming
+    """
+    state = {} if state is None else state
+    missing_chromosomes = state["missing_chromosomes"] = set(state.get("missing_chromosomes", ()))
+    with threaded_writer(output_file) as output:
+        for line in threaded_reader(input_file):
+            if line.startswith("#"):
+                output.write(line)
+                continue
+            columns = line.rstrip("\r\n").split("\t")
+            chromosome = columns[0]
+            if chromosome in mappings:
+                other_columns = "\t".join(columns[1::])
+                output.write(f"{mappings[chromosome]}\t{other_columns}\n")
+            else:
+                if chromosome not in missing_chromosomes:
+                    missing_chromosomes.add(chromosome)
+                    print(f"Chromosome {chromosome} not found in mapping file", file=sys.stderr)
+                if not delete:
+                    output.write(line)
+
+
+def convert_chromosomes_bed(input_file: TextIO, output_file: TextIO, mappings: dict[str, str], delete: bool = False,
+                            state: dict = None):
+    """
+    Converts chromosomes in input BED or bedGraph file.
+
+    :param input_file: BED file with chromosomes to convert
+    :param output_file: output BED file with chromosomes replaced
+    :param mappings: dictionary of input chromosomes to output chromosomes
+    :param delete: remove entries associated to a chromosomes without replacement
+    :param state: processing state saved in checkpoints, restored when resuming
+    """
+    state = {} if state is None else state
+    missing_chromosomes = state["missing_chromosomes"] = set(state.get("missing_chromosomes", ()))
+    with threaded_writer(output_file) as output:
+        for line in threaded_reader(input_file):
+            if line.startswith(("#", "track", "browser")) or not line.strip():
+                output.write(line)
+                continue
+            chromosome, separator, other_columns = line.partition("\t")
+            if chromosome in mappings:
+                output.write(f"{mappings[chromosome]}{separator}{other_columns}")
+            else:
+                if chromosome not in missing_chromosomes:
+                    missing_chromosomes.add(chromosome)
+                    print(f"Chromosome {chromosome} not found in mapping file", file=sys.stderr)
+                if not delete:
+                    output.write(line)
+
+
+def convert_chromosomes_bam(input_file: BinaryIO, output_file: BinaryIO, mappings: dict[str, str]):
+    """
+    Converts chromosomes in input BAM file.
+
+    Alignments refer to chromosomes by their position in the header, so only the BGZF blocks holding the header are
+    decompressed and recompressed, all following blocks are copied byte for byte. Offsets of the following blocks
+    change, so BAM index files must be recreated.
+
+    :param input_file: BAM file with chromosomes to convert, opened in binary mode
+    :param output_file: output BAM file with chromosomes replaced, opened in binary mode
+    :param mappings: dictionary of input chromosomes to output chromosomes
+    """
+    data = bytearray()
+    header_size = None
+    while header_size is None or len(data) < header_size:
+        block = bgzf.read_block(input_file)
+        if block is None:
+            raise ValueError("Truncated BAM header")
+        data += block[1]
+        header_size = bam_header_size(data)
+
+    missing_chromosomes = set()
+
+    def convert(chromosome: str) -> str:
+        if chromosome in mappings:
+            return mappings[chromosome]
+        if chromosome not in missing_chromosomes:
+            missing_chromosomes.add(chromosome)
+            print(f"Chromosome {chromosome} not found in mapping file", file=sys.stderr)
+        return chromosome
+
+    text_length = struct.unpack_from("<i", data, 4)[0]
+    text = data[8:8 + text_length].rstrip(b"\0").decode()
+    text_lines = []
+    for line in text.split("\n"):
+        if line.startswith("@SQ\t"):
+            line = "\t".join(f"SN:{convert(field[3:])}" if field.startswith("SN:") else field
+                             for field in line.split("\t"))
+        text_lines.append(line)
+    text = "\n".join(text_lines).encode()
+
+    header = [b"BAM\1", struct.pack("<i", len(text)), text, data[8 + text_length:12 + text_length]]
+    offset = 12 + text_length
+    for _ in range(struct.unpack_from("<i", data, 8 + text_length)[0]):
+        name_length = struct.unpack_from("<i", data, offset)[0]
+        name = convert(data[offset + 4:offset + 3 + name_length].decode()).encode()
+        header.append(struct.pack("<i", len(name) + 1) + name + b"\0")
+        offset += 4 + name_length
+        header.append(data[offset:offset + 4])
+        offset += 4
+
+    output_file.write(bgzf.compress_blocks(b"".join(header) + data[header_size:]))
+    shutil.copyfileobj(input_file, output_file, 1024 * 1024)
+
+
+def bam_header_size(data: bytes) -> Optional[int]:
+    """
+    Returns the size of the BAM header at the start of decompressed data.
+
+    :param data: start of the decompressed BAM file
+    :return: header size in bytes, or None if data does not contain the whole header
+    """
+    if len(data) < 8:
+        return None
+    if data[:4] != b"BAM\1":
+        raise ValueError("Not a BAM file")
+    offset = 8 + struct.unpack_from("<i", data, 4)[0]
+    if len(data) < offset + 4:
+        return None
+    references = struct.unpack_from("<i", data, offset)[0]
+    offset += 4
+    for _ in range(references):
+        if len(data) < offset + 4:
+            return None
+        offset += 8 + struct.unpack_from("<i", data, offset)[0]
+    return offset if len(data) >= offset else None
+
+
+def parse_mapping(mapping_file: TextIO, source_column: int = 0, converted_column: int = 1) \
+        -> dict[str, str]:
+    """
+    Parse mapping file.
+
+    :param mapping_file: tab delimited dile
+    :param source_column: index of source id columns
+    :param converted_column: index of converted id columns
+    :return: dictionary of source id to converted id
+    """
+    mappings = {}
+    for line in mapping_file:
+        if line.startswith("#"):
+            continue
+        columns = line.rstrip('\r\n').split('\t')
+        source = columns[source_column]
+        converted = columns[converted_column]
+        mappings[source] = converted
+    return mappings
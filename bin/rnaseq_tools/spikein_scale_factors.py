@@ -0,0 +1,166 @@
+# Released under the MIT license.
+
+import os
+from typing import List, Optional, Set, Tuple
+
+import numpy as np
+
+from .utils import get_logger
+
+# Create a logger
+logger = get_logger("spikein_scale_factors")
+
+mqc_header = """#id: 'spikein-gs'
+#plot_type: 'generalstats'
+#pconfig:
+#    percent_spikein:
+#        title: '% Spike-in'
+#        namespace: 'Spike-in'
+#        description: '% counts assigned to spike-in genes'
+#        max: 100
+#        min: 0
+#        scale: 'RdYlGn-rev'
+#    spikein_scale_factor:
+#        title: 'Spike-in scale'
+#        namespace: 'Spike-in'
+#        description: 'Scale factor computed from spike-in counts'
+#        format: '{:,.4f}'"""
+
+
+def read_gene_list(gene_file: str) -> Set[str]:
+    """Read gene ids from a text file containing one gene id per line."""
+    with open(gene_file) as genes:
+        return {line.strip() for line in genes if line.strip() and not line.startswith("#")}
+
+
+def read_gtf_spikein_genes(gtf: str, seqname_prefix: Optional[str], source: Optional[str]) -> Set[str]:
+    """Extract ids of genes located on spike-in sequences or created by a given source from a GTF file."""
+    genes = set()
+    with open(gtf) as gtf_file:
+        for line in gtf_file:
+            if line.startswith("#"):
+                continue
+            columns = line.split("\t", 9)
+            if (seqname_prefix and columns[0].startswith(seqname_prefix)) or (source and columns[1] == source):
+                attributes = columns[8]
+                start = attributes.find('gene_id "')
+                if start != -1:
+                    start += len('gene_id "')
+                    genes.add(attributes[start : attributes.index('"', start)])
+    return genes
+
+
+def read_count_matrix(counts_file: str, id_col: int, count_col: int) -> Tuple[np.ndarray, List[str], np.ndarray]:
+    """Read gene ids, sample names and counts of a merged count matrix.
+
+    Returns a tuple containing the gene ids, the sample names and a genes x samples matrix of counts.
+    """
+    with open(counts_file) as counts:
+        samples = counts.readline().rstrip("\r\n").split("\t")[count_col:]
+    if not samples:
+        raise ValueError(f"No sample columns found in {counts_file}")
+    ids = np.loadtxt(counts_file, delimiter="\t", skiprows=1, usecols=id_col, dtype=str, ndmin=1)
+    matrix = np.loadtxt(
+        counts_file,
+        delimiter="\t",
+        skiprows=1,
+        usecols=range(count_col, count_col + len(samples)),
+        dtype=np.float64,
+        ndmin=2,
+    )
+    return ids, samples, matrix
+
+
+def spikein_scale_factors(
+    counts_files: List[str],
+    spikein_genes: Set[str],
+    id_prefix: Optional[str],
+    outprefix: str,
+    id_col: int = 1,
+    count_col: int = 3,
+) -> None:
+    """Compute spike-in fractions and scale factors of all samples present in merged count matrices.
+
+    The scale factor of a sample is the smallest spike-in count of all samples divided by the spike-in count
+    of the sample, so the sample with the fewest spike-in counts is left unscaled. Several matrices must come
+    from the same quantifier and hold different samples, for example one matrix per sequencing batch.
+    """
+    samples = []
+    totals = []
+    spikeins = []
+    for counts_file in counts_files:
+        ids, file_samples, matrix = read_count_matrix(counts_file, id_col - 1, count_col - 1)
+        mask = np.isin(ids, list(spikein_genes))
+        if id_prefix:
+            mask |= np.char.startswith(ids, id_prefix)
+        logger.info(f"Found {np.count_nonzero(mask)} spike-in genes out of {len(ids)} genes in {counts_file}")
+        for sample in file_samples:
+            if sample in samples:
+                raise ValueError(
+                    f"Sample {sample} found more than once in {counts_file}, count matrices must hold different "
+                    f"samples - run the tool once per quantifier"
+                )
+            samples.append(sample)
+        totals.append(matrix.sum(axis=0))
+        spikeins.append(matrix[mask].sum(axis=0))
+
+    total = np.concatenate(totals)
+    spikein = np.concatenate(spikeins)
+    if not spikein.any():
+        raise ValueError("No spike-in counts found in any sample")
+    if not spikein.all():
+        logger.warning("Some samples have no spike-in counts, their scale factor will be 'nan'")
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        fraction = np.where(total > 0, spikein / total, np.nan)
+        scale_factor = np.where(spikein > 0, spikein[spikein > 0].min() / spikein, np.nan)
+
+    out_dir = os.path.dirname(outprefix)
+    if out_dir and not os.path.exists(out_dir):
+        os.makedirs(out_dir)
+
+    with open(f"{outprefix}.spikein_scale_factors.tsv", "w") as factors:
+        factors.write("sample\ttotal_counts\tspikein_counts\tspikein_fraction\tscale_factor\n")
+        for row in zip(samples, total, spikein, fraction, scale_factor):
+            factors.write("{}\t{:.2f}\t{:.2f}\t{:.6g}\t{:.6g}\n".format(*row))
+
+    with open(f"{outprefix}.spikein_mqc.tsv", "w") as mqc:
+        mqc.write(mqc_header + "\n")
+        mqc.write("Sample\tpercent_spikein\tspikein_scale_factor\n")
+        for sample, sample_fraction, sample_scale_factor in zip(samples, fraction * 100, scale_factor):
+            mqc.write(f"{sample}\t{sample_fraction}\t{sample_scale_factor}\n")
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Calculate spike-in fractions and scale factors from merged gene count matrices."
+    )
+    parser.add_argument(
+        "counts",
+        nargs="+",
+        help="Merged gene count matrices of one quantifier with different samples (e.g. rsem.merged.gene_counts.tsv)",
+    )
+    parser.add_argument("--genes", help="Text file containing spike-in gene ids, one per line")
+    parser.add_argument("--gtf", help="GTF file used to find spike-in genes with --seqname_prefix or --source")
+    parser.add_argument("--seqname_prefix", help="Genes on sequences starting with this prefix are spike-ins")
+    parser.add_argument("--source", help="Genes with this GTF source are spike-ins (e.g. 'transgene')")
+    parser.add_argument("--id_prefix", help="Genes with ids starting with this prefix are spike-ins (e.g. 'ERCC-')")
+    parser.add_argument("--id_col", type=int, default=1, help="Column containing gene ids (1-based)")
+    parser.add_argument("--count_col", type=int, default=3, help="First column containing sample counts (1-based)")
+    parser.add_argument("--outprefix", default="spikein", help="Output prefix")
+    args = parser.parse_args(argv)
+
+    if args.gtf and not (args.seqname_prefix or args.source):
+        parser.error("--gtf requires --seqname_prefix or --source")
+    if not (args.genes or args.gtf or args.id_prefix):
+        parser.error("one of --genes, --gtf or --id_prefix is required to define spike-in genes")
+
+    genes = set()
+    if args.genes:
+        genes |= read_gene_list(args.genes)
+    if args.gtf:
+        genes |= read_gtf_spikein_genes(args.gtf, args.seqname_prefix, args.source)
+
+    spikein_scale_factors(args.counts, genes, args.id_prefix, args.outprefix, args.id_col, args.count_col)
@@ -0,0 +1,253 @@
+# Released under the MIT license.
+
+"""Background reader and writer threads used by the streaming text tools.
+
+Reading, processing and writing a file line by line on a single thread means every blocking read or write
+(slow on network filesystems) stalls processing. ThreadedReader prefetches large chunks of the input file on
+a background thread and ThreadedWriter hands large output chunks to another thread, both through bounded
+queues, so the processing loop overlaps with I/O and with gzip (de)compression which releases the GIL.
+
+Threads cost more per line than they save on plain files of a local disk, which the operating system already
+reads ahead and writes back asynchronously. threaded_reader and threaded_writer only use threads for gzip
+compressed files and files on network filesystems, and otherwise read and write the buffered file directly.
+"""
+
+import gzip
+import io
+import os
+import queue
+import sys
+import threading
+from typing import BinaryIO, Iterator, TextIO, Union
+
+CHUNK_SIZE = 4 * 1024 * 1024
+QUEUE_SIZE = 4
+
+# Filesystem types from /proc/mounts on which blocking reads and writes are slow enough to use threads
+NETWORK_FILESYSTEMS = frozenset({
+    "9p", "afs", "beegfs", "ceph", "cifs", "fuse.ceph", "fuse.gcsfuse", "fuse.glusterfs", "fuse.s3fs", "fuse.sshfs",
+    "glusterfs", "gpfs", "lustre", "nfs", "nfs4", "panfs", "smb3", "smbfs", "wekafs",
+})
+
+_mounts = None
+
+
+def open_text(path: str, mode: str = "r") -> TextIO:
+    """Open a text file for reading or writing.
+
+    '-' means standard input or output and files ending with '.gz' are (de)compressed using gzip.
+    """
+    if path == "-":
+        return sys.stdout if "w" in mode or "a" in mode else sys.stdin
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t")
+    return open(path, mode)
+
+
+def open_binary(path: str, mode: str = "r") -> BinaryIO:
+    """Open a binary file for reading or writing, '-' means standard input or output."""
+    if path == "-":
+        return sys.stdout.buffer if "w" in mode or "a" in mode else sys.stdin.buffer
+    return open(path, mode + "b")
+
+
+def filesystem_type(path: str) -> str:
+    """Returns the type of the filesystem holding path, read from /proc/mounts, or an empty string if unknown."""
+    global _mounts
+    if _mounts is None:
+        _mounts = []
+        try:
+            with open("/proc/mounts") as mounts:
+                for line in mounts:
+                    fields = line.split()
+                    if len(fields) > 2:
+                        # Spaces and other special characters are escaped as octal numbers
+                        _mounts.append((fields[1].encode().decode("unicode_escape"), fields[2]))
+        except OSError:
+            pass
+        _mounts.sort(key=lambda mount: len(mount[0]), reverse=True)
+    path = os.path.realpath(path)
+    for mount_point, fs_type in _mounts:
+        if path == mount_point or path.startswith(mount_point.rstrip("/") + "/"):
+            return fs_type
+    return ""
+
+
+def use_threads(file) -> bool:
+    """Whether reading or writing file line by line is faster with a background thread.
+
+    True for gzip compressed files and files on network filesystems, false for standard input and output. Setting
+    the RNASEQ_TOOLS_THREADS environment variable to 1 or 0 forces threads on or off, to compare both on a given
+    filesystem.
+    """
+    forced = os.environ.get("RNASEQ_TOOLS_THREADS")
+    if forced in ("0", "1"):
+        return forced == "1"
+    name = getattr(file, "name", None)
+    if not isinstance(name, str) or name in ("-", "<stdin>", "<stdout>"):
+        return False
+    return name.endswith(".gz") or filesystem_type(name) in NETWORK_FILESYSTEMS
+
+
+def threaded_reader(file) -> Union["ThreadedReader", TextIO]:
+    """Returns file if it is already a ThreadedReader or does not benefit from one, otherwise a new ThreadedReader."""
+    return ThreadedReader(file) if not isinstance(file, ThreadedReader) and use_threads(file) else file
+
+
+def threaded_writer(file) -> Union["ThreadedWriter", "DirectWriter"]:
+    """Returns file if it is already a writer of this module, otherwise a new ThreadedWriter if file benefits from
+    one or a DirectWriter."""
+    if isinstance(file, (ThreadedWriter, DirectWriter)):
+        return file
+    return ThreadedWriter(file) if use_threads(file) else DirectWriter(file)
+
+
+class ThreadedReader:
+    """Iterates over the lines of a text file while a background thread reads the following chunks."""
+
+    def __init__(self, file: TextIO, chunk_size: int = CHUNK_SIZE, queue_size: int = QUEUE_SIZE):
+        self.file = file
+        self._chunk_size = chunk_size
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._thread = threading.Thread(target=self._read, daemon=True)
+        self._thread.start()
+
+    def _read(self) -> None:
+        try:
+            while True:
+                chunk = self.file.read(self._chunk_size)
+                self._queue.put(chunk)
+                if not chunk:
+                    return
+        except BaseException as exception:
+            self._queue.put(exception)
+
+    def chunks(self) -> Iterator[str]:
+        """Yields the chunks read from the file, in order."""
+        while True:
+            chunk = self._queue.get()
+            if isinstance(chunk, BaseException):
+                raise chunk
+            if not chunk:
+                return
+            yield chunk
+
+    def __iter__(self) -> Iterator[str]:
+        parts = []
+        for chunk in self.chunks():
+            end = chunk.rfind("\n") + 1
+            if not end:
+                parts.append(chunk)
+                continue
+            parts.append(chunk[:end])
+            # StringIO splits lines on "\n" only, without a Python level step per line
+            yield from io.StringIO("".join(parts))
+            parts = [chunk[end:]] if end < len(chunk) else []
+        if parts:
+            yield "".join(parts)
+
+
+class ThreadedWriter:
+    """Buffers written text and hands large chunks to a background thread that writes them to a text file.
+
+    The file is not closed by close(), only flushed.
+    """
+
+    def __init__(self, file: TextIO, chunk_size: int = CHUNK_SIZE, queue_size: int = QUEUE_SIZE):
+        self.file = file
+        self._chunk_size = chunk_size
+        self._buffer = []
+        self._buffer_size = 0
+        self._error = None
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._thread = threading.Thread(target=self._write, daemon=True)
+        self._thread.start()
+
+    def _write(self) -> None:
+        while True:
+            chunk = self._queue.get()
+            if chunk is None:
+                self._queue.task_done()
+                return
+            if self._error is None:
+                try:
+                    self.file.write(chunk)
+                except BaseException as exception:
+                    self._error = exception
+            self._queue.task_done()
+
+    def write(self, text: str) -> None:
+        self._buffer.append(text)
+        self._buffer_size += len(text)
+        if self._buffer_size >= self._chunk_size:
+            self.flush()
+
+    def writelines(self, lines) -> None:
+        for line in lines:
+            self.write(line)
+
+    def flush(self) -> None:
+        """Hands buffered text to the writer thread."""
+        if self._error is not None:
+            raise self._error
+        if self._buffer:
+            self._queue.put("".join(self._buffer))
+            self._buffer = []
+            self._buffer_size = 0
+
+    def sync(self) -> None:
+        """Waits for the writer thread to write all text written so far and flushes the file."""
+        self.flush()
+        self._queue.join()
+        if self._error is not None:
+            raise self._error
+        self.file.flush()
+
+    def close(self) -> None:
+        """Writes all remaining text and waits for the writer thread to finish."""
+        if not self._thread.is_alive():
+            return
+        try:
+            self.flush()
+        finally:
+            self._queue.put(None)
+            self._thread.join()
+        if self._error is not None:
+            raise self._error
+        self.file.flush()
+
+    def __enter__(self) -> "ThreadedWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+
+class DirectWriter:
+    """Writes text straight to a buffered text file, with the same interface as ThreadedWriter.
+
+    The file is not closed by close(), only flushed.
+    """
+
+    def __init__(self, file: TextIO):
+        self.file = file
+        # Bound methods of the file avoid a Python level call per line
+        self.write = file.write
+        self.writelines = file.writelines
+
+    def flush(self) -> None:
+        """Nothing to hand over, text is written to the file buffer directly."""
+
+    def sync(self) -> None:
+        """Flushes the file."""
+        self.file.flush()
+
+    def close(self) -> None:
+        """Flushes the file."""
+        self.file.flush()
+
+    def __enter__(self) -> "DirectWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
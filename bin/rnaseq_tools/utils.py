@@ -0,0 +1,46 @@
+# Released under the MIT license.
+
+"""Helpers shared by the tools."""
+
+LOG_FORMAT = "%(name)s - %(asctime)s %(levelname)s: %(message)s"
+
+
+class LazyLogger:
+    """Logger that imports and configures logging on first use, so tools that never log do not pay for it."""
+
+    def __init__(self, name: str):
+        self._name = name
+        self._logger = None
+
+    def __getattr__(self, attribute):
+        if self._logger is None:
+            import logging
+
+            logging.basicConfig(format=LOG_FORMAT)
+            self._logger = logging.getLogger(self._name)
+            self._logger.setLevel(logging.INFO)
+        return getattr(self._logger, attribute)
+
+
+def get_logger(name: str) -> LazyLogger:
+    """Return the logger of a tool, configured with the format used by all tools."""
+    return LazyLogger(name)
+
+
+def guess_format(filename: str) -> str:
+    """
+    Guesses file format using filename extension.
+
+    :param filename: file name, may end with .gz
+    :return: 'fasta', 'gff', 'bed', 'bam' or None if format is unknown
+    """
+    filename = filename.lower().removesuffix(".gz")
+    if filename.endswith(".fasta") or filename.endswith(".fa") or filename.endswith(".fna"):
+        return "fasta"
+    elif filename.endswith(".gff") or filename.endswith(".gtf"):
+        return "gff"
+    elif filename.endswith(".bed") or filename.endswith(".bedgraph") or filename.endswith(".bdg"):
+        return "bed"
+    elif filename.endswith(".bam"):
+        return "bam"
+    return None
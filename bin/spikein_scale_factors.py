@@ -0,0 +1,10 @@
+#!/usr/bin/env python
+
+# Pipeline entry point for the rnaseq_tools/spikein_scale_factors.py module, which holds the implementation.
+
+import sys
+
+from rnaseq_tools.spikein_scale_factors import main
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -109,6 +109,7 @@ workflow NFCORE_RNASEQ {
         PREPARE_GENOME.out.chrom_sizes,
         PREPARE_GENOME.out.gene_bed,
         PREPARE_GENOME.out.transcript_fasta,
+        PREPARE_GENOME.out.tx2gene,
         PREPARE_GENOME.out.star_index,
         PREPARE_GENOME.out.rsem_index,
         PREPARE_GENOME.out.hisat2_index,
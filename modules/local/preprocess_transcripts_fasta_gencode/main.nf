@@ -3,29 +3,32 @@ process PREPROCESS_TRANSCRIPTS_FASTA_GENCODE {
 
     conda "${moduleDir}/environment.yml"
     container "${ workflow.containerEngine == 'singularity' && !task.ext.singularity_pull_docker_container ?
-        'https://depot.galaxyproject.org/singularity/ubuntu:20.04' :
-        'nf-core/ubuntu:20.04' }"
+        'https://depot.galaxyproject.org/singularity/python:3.9--1' :
+        'biocontainers/python:3.9--1' }"
 
     input:
     path fasta
 
     output:
-    path "*.fa"        , emit: fasta
-    path "versions.yml", emit: versions
+    path "*.fa"          , emit: fasta
+    path "*.tx2gene.tsv" , emit: tx2gene
+    path "versions.yml"  , emit: versions
 
     when:
     task.ext.when == null || task.ext.when
 
-    script:
+    script: // preprocess_transcripts_fasta_gencode.py is bundled with the pipeline, in nf-core/rnaseq/bin/
     def gzipped = fasta.toString().endsWith('.gz')
     def outfile = gzipped ? file(fasta.baseName).baseName : fasta.baseName
-    def command = gzipped ? 'zcat' : 'cat'
     """
-    $command $fasta | cut -d "|" -f1 > ${outfile}.fixed.fa
+    preprocess_transcripts_fasta_gencode.py \\
+        $fasta \\
+        ${outfile}.fixed.fa \\
+        ${outfile}.tx2gene.tsv
 
     cat <<-END_VERSIONS > versions.yml
     "${task.process}":
-        sed: \$(echo \$(sed --version 2>&1) | sed 's/^.*GNU sed) //; s/ .*\$//')
+        python: \$(python --version | sed 's/Python //g')
     END_VERSIONS
     """
 
@@ -34,10 +37,11 @@ process PREPROCESS_TRANSCRIPTS_FASTA_GENCODE {
     def outfile = gzipped ? file(fasta.baseName).baseName : fasta.baseName
     """
     touch ${outfile}.fixed.fa
+    touch ${outfile}.tx2gene.tsv
 
     cat <<-END_VERSIONS > versions.yml
     "${task.process}":
-        sed: \$(echo \$(sed --version 2>&1) | sed 's/^.*GNU sed) //; s/ .*\$//')
+        python: \$(python --version | sed 's/Python //g')
     END_VERSIONS
     """
 }
@@ -12,9 +12,11 @@ process CUSTOM_CATADDITIONALFASTA {
     val  biotype
 
     output:
-    tuple val(meta), path("*/*.fasta") , emit: fasta
-    tuple val(meta), path("*/*.gtf")   , emit: gtf
-    path "versions.yml"                , emit: versions
+    tuple val(meta), path("*/*.fasta")         , emit: fasta
+    tuple val(meta), path("*/*.gtf")           , emit: gtf
+    tuple val(meta), path("*/*.transcripts.fa"), emit: transcript_fasta
+    tuple val(meta), path("*/*.tx2gene.tsv")   , emit: tx2gene
+    path "versions.yml"                        , emit: versions
 
     when:
     task.ext.when == null || task.ext.when
@@ -28,6 +30,8 @@ process CUSTOM_CATADDITIONALFASTA {
     mkdir out
     touch out/genome_transcriptome.fasta
     touch out/genome_transcriptome.gtf
+    touch out/genome_transcriptome.transcripts.fa
+    touch out/genome_transcriptome.tx2gene.tsv
 
     cat <<-END_VERSIONS > versions.yml
     "${task.process}":
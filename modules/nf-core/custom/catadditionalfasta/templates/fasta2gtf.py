@@ -5,8 +5,10 @@
 import logging
 import os
 import platform
+import shutil
+from concurrent.futures import ProcessPoolExecutor
 from itertools import groupby
-from typing import Iterator, Tuple
+from typing import Dict, Iterator, List, Set, Tuple
 
 
 def setup_logging() -> logging.Logger:
@@ -65,25 +67,92 @@ def parse_fasta(fasta_file: str) -> Iterator[Tuple[str, str]]:
             yield (header_str, sequence)
 
 
-def fasta_to_gtf(fasta: str, output_file: str, biotype: str) -> None:
+def fasta_to_gtf(fasta: str, output_file: str, biotype: str, transcript_file: str, tx2gene_file: str) -> List[str]:
     """
-    Read a fasta file and create a GTF file.
+    Read a fasta file and create a GTF file, a transcript fasta file and a tx2gene file.
+
+    Each sequence is a single-exon transcript, so the transcript fasta records are the sequences themselves
+    named after the transcript_id written in the GTF. The tx2gene file has no header so it can be appended to
+    an existing one.
 
     Args:
         fasta (str): Path to the fasta file.
         output_file (str): Path for the output GTF file.
         biotype (str): The biotype to use in the GTF.
+        transcript_file (str): Path for the output transcript fasta file.
+        tx2gene_file (str): Path for the output tx2gene file.
+
+    Returns:
+        List[str]: Sequence names written to the GTF file, in fasta order.
     """
     fasta_iter = parse_fasta(fasta)
-    lines = []
+    seq_names = []
+
+    with open(output_file, "w") as gtf_handle, open(transcript_file, "w") as transcript_handle, open(
+        tx2gene_file, "w"
+    ) as tx2gene_handle:
+        for header, sequence in fasta_iter:
+            seq_name = header.split()[0].replace(" ", "_")
+            gtf_handle.write(generate_gtf_line(seq_name, len(sequence), biotype))
+            transcript_handle.write(generate_transcript_record(seq_name, sequence))
+            tx2gene_handle.write(generate_tx2gene_line(seq_name))
+            seq_names.append(seq_name)
+
+    return seq_names
+
+
+def read_fasta_seq_names(fasta: str) -> Set[str]:
+    """Read the sequence names of a fasta file.
+
+    The samtools index (fasta.fai) is used when present so the sequence itself is never read.
+    Otherwise only the header lines are decoded while scanning the file.
+
+    Args:
+        fasta (str): Path to the fasta file.
+
+    Returns:
+        Set[str]: Sequence names present in the fasta file.
+    """
+    fai = f"{fasta}.fai"
+    if os.path.exists(fai):
+        with open(fai) as file_handle:
+            return {line.split("\t", 1)[0] for line in file_handle if line.strip()}
+
+    with open(fasta, "rb") as file_handle:
+        return {line[1:].split(None, 1)[0].decode() for line in file_handle if line.startswith(b">")}
+
+
+def check_seq_name_collisions(genome_seq_names: Set[str], add_seq_names: Dict[str, List[str]]) -> None:
+    """Check that added sequences do not clash with the genome or with each other.
+
+    Args:
+        genome_seq_names (Set[str]): Sequence names of the genome fasta.
+        add_seq_names (Dict[str, List[str]]): Sequence names of each additional fasta.
+
+    Raises:
+        ValueError: If a sequence name is present more than once.
+    """
+    seen = {}
+    for add_fasta, seq_names in add_seq_names.items():
+        for seq_name in seq_names:
+            if seq_name in genome_seq_names:
+                raise ValueError(f"Sequence '{seq_name}' from {add_fasta} is already present in the genome fasta")
+            if seq_name in seen:
+                raise ValueError(f"Sequence '{seq_name}' is present in both {seen[seq_name]} and {add_fasta}")
+            seen[seq_name] = add_fasta
 
-    for header, sequence in fasta_iter:
-        seq_name = header.split()[0].replace(" ", "_")
-        line = generate_gtf_line(seq_name, len(sequence), biotype)
-        lines.append(line)
 
-    with open(output_file, "w") as file_handle:
-        file_handle.writelines(lines)
+def concatenate_files(input_files: List[str], output_file: str) -> None:
+    """Concatenate files into a single output file, like cat.
+
+    Args:
+        input_files (List[str]): Paths of the files to concatenate, in order.
+        output_file (str): Path of the concatenated file.
+    """
+    with open(output_file, "wb") as output_handle:
+        for input_file in input_files:
+            with open(input_file, "rb") as input_handle:
+                shutil.copyfileobj(input_handle, output_handle, 1024 * 1024)
 
 
 def generate_gtf_line(name: str, length: int, biotype: str) -> str:
@@ -102,6 +171,33 @@ def generate_gtf_line(name: str, length: int, biotype: str) -> str:
     return f"{name}\\ttransgene\\texon\\t1\\t{length}\\t.\\t+\\t.\\t{attributes}"
 
 
+def generate_transcript_record(name: str, sequence: str, line_length: int = 60) -> str:
+    """Generate the transcript fasta record of a sequence, matching the transcript_id of its GTF line.
+
+    Args:
+        name (str): Name of the sequence.
+        sequence (str): Sequence.
+        line_length (int): Maximum length of sequence lines.
+
+    Returns:
+        str: A formatted fasta record.
+    """
+    lines = [sequence[i : i + line_length] for i in range(0, len(sequence), line_length)]
+    return f">{name}_gene\\n" + "".join(f"{line}\\n" for line in lines)
+
+
+def generate_tx2gene_line(name: str) -> str:
+    """Generate the tx2gene line of a sequence: transcript_id, gene_id and gene_name of its GTF line.
+
+    Args:
+        name (str): Name of the sequence.
+
+    Returns:
+        str: A formatted tx2gene line.
+    """
+    return f"{name}_gene\\t{name}_gene\\t{name}_gene\\n"
+
+
 def main() -> None:
     # Parse arguments using argparse (not shown for brevity)
     # Example: args = parser.parse_args()
@@ -109,17 +205,41 @@ def main() -> None:
     logger = setup_logging()
     logger.info("Starting fasta to GTF conversion.")
 
-    # Add fasta lines to GTF
-    add_name = os.path.splitext(os.path.basename("$add_fasta"))[0]
-    fasta_to_gtf("$add_fasta", f"{add_name}.gtf", "$biotype")
-
-    # Concatenate new fasta to existing fasta, and the GTF we just generated to the GTF
+    # Several additional fasta files can be staged at once
+    add_fastas = "$add_fasta".split()
+    add_names = [os.path.splitext(os.path.basename(add_fasta))[0] for add_fasta in add_fastas]
+    # Prefix intermediate files with the file index, so gfp.fa and gfp.fasta do not overwrite each other
+    add_prefixes = [f"{index}_{add_name}" for index, add_name in enumerate(add_names)]
+    add_gtfs = [f"{add_prefix}.gtf" for add_prefix in add_prefixes]
+    add_transcripts = [f"{add_prefix}.transcripts.fa" for add_prefix in add_prefixes]
+    add_tx2genes = [f"{add_prefix}.tx2gene.tsv" for add_prefix in add_prefixes]
+
+    # Write GTF, transcript fasta and tx2gene of every additional fasta while reading the genome sequence names
+    workers = max(1, min(int("$task.cpus"), len(add_fastas) + 1))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        genome_seq_names = executor.submit(read_fasta_seq_names, "$fasta")
+        add_seq_names = {
+            add_fasta: executor.submit(fasta_to_gtf, add_fasta, add_gtf, "$biotype", add_transcript, add_tx2gene)
+            for add_fasta, add_gtf, add_transcript, add_tx2gene in zip(
+                add_fastas, add_gtfs, add_transcripts, add_tx2genes
+            )
+        }
+        check_seq_name_collisions(
+            genome_seq_names.result(), {add_fasta: future.result() for add_fasta, future in add_seq_names.items()}
+        )
+
+    # Concatenate new fasta files to existing fasta, and the GTFs we just generated to the GTF
     genome_name = "$params.genome" if "$params.genome" != "null" else os.path.splitext(os.path.basename("$fasta"))[0]
+    add_name = "_".join(add_names)
     output_prefix = "$task.ext.prefix" if "$task.ext.prefix" != "null" else f"{genome_name}_{add_name}"
 
     os.mkdir("out")
-    os.system(f"cat $fasta $add_fasta > out/{output_prefix}.fasta")
-    os.system(f"cat $gtf {add_name}.gtf > out/{output_prefix}.gtf")
+    concatenate_files(["$fasta"] + add_fastas, f"out/{output_prefix}.fasta")
+    concatenate_files(["$gtf"] + add_gtfs, f"out/{output_prefix}.gtf")
+
+    # Transcripts of the added sequences only, to append to an existing transcriptome
+    concatenate_files(add_transcripts, f"out/{output_prefix}.transcripts.fa")
+    concatenate_files(add_tx2genes, f"out/{output_prefix}.tx2gene.tsv")
 
     logger.info("Conversion completed successfully.")
 
@@ -41,7 +41,7 @@ workflow PREPARE_GENOME {
     fasta                    // file: /path/to/genome.fasta (optional!)
     gtf                      // file: /path/to/genome.gtf
     gff                      // file: /path/to/genome.gff
-    additional_fasta         // file: /path/to/additional.fasta
+    additional_fasta         // file: /path/to/additional.fasta, or list/comma-separated string of files
     transcript_fasta         // file: /path/to/transcript.fasta
     gene_bed                 // file: /path/to/gene.bed
     splicesites              // file: /path/to/splicesites.txt
@@ -127,16 +127,25 @@ workflow PREPARE_GENOME {
     //---------------------------------------------------
     ch_add_fasta = Channel.empty()
     if (fasta_provided && additional_fasta) {
-        if (additional_fasta.endsWith('.gz')) {
-            ch_add_fasta = GUNZIP_ADDITIONAL_FASTA([ [:], file(additional_fasta, checkIfExists: true) ]).gunzip.map { it[1] }
-            ch_versions  = ch_versions.mix(GUNZIP_ADDITIONAL_FASTA.out.versions)
-        } else {
-            ch_add_fasta = Channel.value(file(additional_fasta, checkIfExists: true))
-        }
+        // Several files can be given as a list or a comma-separated string, they are all added in a single task
+        def add_fasta_list = additional_fasta instanceof List ? additional_fasta : additional_fasta.toString().tokenize(',')*.trim()
+        def ch_add_fasta_files = Channel
+            .fromList(add_fasta_list.withIndex())
+            .map { add_fasta, index -> [ [ index: index ], file(add_fasta, checkIfExists: true) ] }
+            .branch { meta, add_fasta ->
+                gzipped: add_fasta.name.endsWith('.gz')
+                plain: true
+            }
+        GUNZIP_ADDITIONAL_FASTA(ch_add_fasta_files.gzipped)
+        ch_versions  = ch_versions.mix(GUNZIP_ADDITIONAL_FASTA.out.versions.first())
+        ch_add_fasta = GUNZIP_ADDITIONAL_FASTA.out.gunzip
+            .mix(ch_add_fasta_files.plain)
+            .toSortedList { a, b -> a[0].index <=> b[0].index }
+            .map { add_fastas -> [ [:], add_fastas.collect { it[1] } ] }
 
         CUSTOM_CATADDITIONALFASTA(
             ch_fasta.combine(ch_gtf).map { fasta, gtf -> [ [:], fasta, gtf ] },
-            ch_add_fasta.map { [ [:], it ] },
+            ch_add_fasta,
             gencode ? "gene_type" : featurecounts_group_type
         )
         ch_fasta    = CUSTOM_CATADDITIONALFASTA.out.fasta.map { it[1] }.first()
@@ -166,6 +175,7 @@ workflow PREPARE_GENOME {
     //    - If not provided but have genome+GTF, create from them
     //----------------------------------------------------------------------
     ch_transcript_fasta = Channel.empty()
+    ch_tx2gene          = Channel.empty()
     if (transcript_fasta) {
         // Use user-provided transcript FASTA
         if (transcript_fasta.endsWith('.gz')) {
@@ -177,6 +187,7 @@ workflow PREPARE_GENOME {
         if (gencode) {
             PREPROCESS_TRANSCRIPTS_FASTA_GENCODE(ch_transcript_fasta)
             ch_transcript_fasta = PREPROCESS_TRANSCRIPTS_FASTA_GENCODE.out.fasta
+            ch_tx2gene          = PREPROCESS_TRANSCRIPTS_FASTA_GENCODE.out.tx2gene
             ch_versions         = ch_versions.mix(PREPROCESS_TRANSCRIPTS_FASTA_GENCODE.out.versions)
         }
     } else if (fasta_provided) {
@@ -410,6 +421,7 @@ workflow PREPARE_GENOME {
     fai              = ch_fai                    // channel: path(genome.fai)
     gene_bed         = ch_gene_bed               // channel: path(gene.bed)
     transcript_fasta = ch_transcript_fasta       // channel: path(transcript.fasta)
+    tx2gene          = ch_tx2gene                // channel: path(tx2gene.tsv), GENCODE transcript FASTA only
     chrom_sizes      = ch_chrom_sizes            // channel: path(genome.sizes)
     splicesites      = ch_splicesites            // channel: path(genome.splicesites.txt)
     bbsplit_index    = ch_bbsplit_index          // channel: path(bbsplit/index/)
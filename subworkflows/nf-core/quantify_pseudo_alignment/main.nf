@@ -24,6 +24,7 @@ workflow QUANTIFY_PSEUDO_ALIGNMENT {
     lib_type                  //     val: String to override Salmon library type
     kallisto_quant_fraglen    //     val: Estimated fragment length required by Kallisto in single-end mode
     kallisto_quant_fraglen_sd //     val: Estimated standard error for fragment length required by Kallisto in single-end mode
+    tx2gene                   // channel: /path/to/tx2gene.tsv (optional, CUSTOM_TX2GENE is skipped if provided)
 
     main:
     ch_versions = Channel.empty()
@@ -58,18 +59,25 @@ workflow QUANTIFY_PSEUDO_ALIGNMENT {
         ch_versions = ch_versions.mix(KALLISTO_QUANT.out.versions.first())
     }
 
+    //
+    // Map transcripts to genes from the GTF, unless a mapping was provided
+    //
     CUSTOM_TX2GENE (
-        gtf.map { [ [:], it ] },
+        gtf
+            .combine(tx2gene.count())
+            .filter { gtf_file, tx2gene_count -> tx2gene_count == 0 }
+            .map { gtf_file, tx2gene_count -> [ [:], gtf_file ] },
         ch_pseudo_results.collect{ it[1] }.map { [ [:], it ] },
         pseudo_aligner,
         gtf_id_attribute,
         gtf_extra_attribute
     )
+    ch_tx2gene  = CUSTOM_TX2GENE.out.tx2gene.mix(tx2gene.map { [ [:], it ] }).first()
     ch_versions = ch_versions.mix(CUSTOM_TX2GENE.out.versions)
 
     TXIMETA_TXIMPORT (
         ch_pseudo_results.collect{ it[1] }.map { [ ['id': 'all_samples'], it ] },
-        CUSTOM_TX2GENE.out.tx2gene,
+        ch_tx2gene,
         pseudo_aligner
     )
     ch_versions = ch_versions.mix(TXIMETA_TXIMPORT.out.versions)
@@ -83,7 +91,7 @@ workflow QUANTIFY_PSEUDO_ALIGNMENT {
 
     SE_GENE_UNIFIED (
         ch_gene_unified,
-        CUSTOM_TX2GENE.out.tx2gene,
+        ch_tx2gene,
         samplesheet
     )
     ch_versions = ch_versions.mix(SE_GENE_UNIFIED.out.versions)
@@ -95,7 +103,7 @@ workflow QUANTIFY_PSEUDO_ALIGNMENT {
 
     SE_TRANSCRIPT_UNIFIED (
         ch_transcript_unified,
-        CUSTOM_TX2GENE.out.tx2gene,
+        ch_tx2gene,
         samplesheet
     )
     ch_versions = ch_versions.mix(SE_TRANSCRIPT_UNIFIED.out.versions)
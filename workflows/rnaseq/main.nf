@@ -87,6 +87,7 @@ workflow RNASEQ {
     ch_chrom_sizes       // channel: path(genome.sizes)
     ch_gene_bed          // channel: path(gene.bed)
     ch_transcript_fasta  // channel: path(transcript.fasta)
+    ch_tx2gene           // channel: path(tx2gene.tsv), empty unless derived from GENCODE transcript headers
     ch_star_index        // channel: path(star/index/)
     ch_rsem_index        // channel: path(rsem/index/)
     ch_hisat2_index      // channel: path(hisat2/index/)
@@ -104,6 +105,15 @@ workflow RNASEQ {
     ch_map_status = Channel.empty()
     ch_strand_status = Channel.empty()
 
+    //
+    // The GENCODE transcript to gene mapping only holds gene IDs and names, use it instead of the
+    // GTF derived one when quantifying with these attributes
+    //
+    ch_quant_tx2gene = Channel.empty()
+    if (params.gtf_group_features == 'gene_id' && params.gtf_extra_attributes == 'gene_name') {
+        ch_quant_tx2gene = ch_tx2gene
+    }
+
     //
     // Create channel from input file provided through params.input
     //
@@ -257,7 +267,8 @@ workflow RNASEQ {
             true,
             params.salmon_quant_libtype ?: '',
             params.kallisto_quant_fraglen,
-            params.kallisto_quant_fraglen_sd
+            params.kallisto_quant_fraglen_sd,
+            ch_quant_tx2gene
         )
         ch_versions = ch_versions.mix(QUANTIFY_STAR_SALMON.out.versions)
 
@@ -672,7 +683,8 @@ workflow RNASEQ {
             false,
             params.salmon_quant_libtype ?: '',
             params.kallisto_quant_fraglen,
-            params.kallisto_quant_fraglen_sd
+            params.kallisto_quant_fraglen_sd,
+            ch_quant_tx2gene
         )
         ch_counts_gene_length_scaled = QUANTIFY_PSEUDO_ALIGNMENT.out.counts_gene_length_scaled
         ch_multiqc_files = ch_multiqc_files.mix(QUANTIFY_PSEUDO_ALIGNMENT.out.multiqc.collect{it[1]})